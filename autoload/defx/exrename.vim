@@ -125,58 +125,35 @@ function! s:do_rename() abort
   endif
 
   " Rename files.
+  let renames = []
+  let linenrs = []
   let linenr = 1
-  let max = line('$')
-  while linenr <= max
-    let filename = b:exrename.filenames[linenr - 1]
-
-    redraw
-    echo printf('(%'.len(max).'d/%d): %s -> %s',
-          \ linenr, max, filename, getline(linenr))
-
-    if filename ==# getline(linenr)
-      let linenr += 1
-      continue
-    endif
-
-    let old_file = b:exrename.candidates[linenr - 1].action__path
-    let new_file = expand(getline(linenr))
-    if !s:is_absolute(new_file)
-      " Convert to absolute path
-      let new_file = b:exrename.cwd . new_file
-    endif
-
-    if filereadable(new_file) || isdirectory(new_file)
-      " new_file is already exists.
-      redraw
-      call defx#util#print_error(
-            \ new_file . ' is already exists. Skip.')
-
-      let linenr += 1
-      continue
-    endif
-
-    " Create the parent directory.
-    call mkdir(fnamemodify(new_file, ':h'), 'p')
-
-    if rename(old_file, new_file)
-      " Rename error
-      redraw
-      call defx#util#print_error(
-            \ new_file . ' is rename error. Skip.')
-
-      let linenr += 1
-      continue
+  for filename in b:exrename.filenames
+    if filename !=# getline(linenr)
+      let new_file = expand(getline(linenr))
+      if !s:is_absolute(new_file)
+        " Convert to absolute path
+        let new_file = b:exrename.cwd . new_file
+      endif
+      call add(renames, [
+            \ b:exrename.candidates[linenr - 1].action__path, new_file])
+      call add(linenrs, linenr)
     endif
+    let linenr += 1
+  endfor
 
-    call defx#util#buffer_rename(bufnr(old_file), new_file)
+  let done = defx#util#rpcrequest('_defx_bulk_rename', [renames], v:false)
+  if type(done) != v:t_list
+    " The rpcrequest() is failed
+    return
+  endif
 
-    " update b:exrename
+  " update b:exrename
+  for idx in done
+    let linenr = linenrs[idx]
     let b:exrename.filenames[linenr - 1] = getline(linenr)
-    let b:exrename.candidates[linenr - 1].action__path = new_file
-
-    let linenr += 1
-  endwhile
+    let b:exrename.candidates[linenr - 1].action__path = renames[idx][1]
+  endfor
 
   redraw
   echo 'Rename done!'
@@ -200,8 +177,6 @@ function! s:exit(bufnr) abort
     call s:custom_alternate_buffer()
   endif
   silent execute 'bdelete!' a:bufnr
-
-  call defx#redraw()
 endfunction
 
 function! s:check_lines() abort
@@ -13,9 +13,12 @@ function! defx#init#_initialize() abort
 
   augroup defx
     autocmd!
+    " The column highlights are defined again if it is changed
+    autocmd ColorScheme * let g:defx#_highlight_generation += 1
   augroup END
 
   let g:defx#_histories = []
+  let g:defx#_highlight_generation = 0
   let g:defx#_previewed_buffers = {}
   let g:defx#_async_job = 0
 endfunction
@@ -106,8 +109,10 @@ function! defx#init#_user_options() abort
         \ 'ignored_files': '.*',
         \ 'ignored_recursive_files': '',
         \ 'listed': v:false,
+        \ 'max_cursor_history': 100,
         \ 'new': v:false,
         \ 'post_action': '',
+        \ 'preview_head_size': 262144,
         \ 'preview_height': &previewheight,
         \ 'preview_width': 40,
         \ 'profile': v:false,
@@ -116,6 +121,7 @@ function! defx#init#_user_options() abort
         \ 'search': '',
         \ 'search_recursive': '',
         \ 'session_file': '',
+        \ 'snapshot_file': '',
         \ 'show_ignored_files': v:false,
         \ 'show_parent': v:false,
         \ 'sort': 'filename',
@@ -88,6 +88,18 @@ function! defx#util#input(prompt, ...) abort
     return ''
   endtry
 endfunction
+function! defx#util#narrow_input(prompt) abort
+  augroup defx-narrow
+    autocmd!
+    autocmd CmdlineChanged @
+          \ call defx#call_action('narrow', [getcmdline()]) | redraw
+  augroup END
+  try
+    return defx#util#input(a:prompt)
+  finally
+    autocmd! defx-narrow
+  endtry
+endfunction
 function! defx#util#confirm(msg, choices, default) abort
   try
     return confirm(a:msg, a:choices, a:default)
@@ -373,6 +385,12 @@ function! defx#util#buffer_rename(bufnr, new_filename) abort
   let &hidden = hidden
 endfunction
 
+function! defx#util#buffer_rename_all(renames) abort
+  for [old, new] in a:renames
+    call defx#util#buffer_rename(bufnr(old), new)
+  endfor
+endfunction
+
 function! defx#util#buffer_delete(bufnr) abort
   if a:bufnr < 0
     return
@@ -392,6 +410,12 @@ function! defx#util#buffer_delete(bufnr) abort
   endif
 endfunction
 
+function! defx#util#buffer_delete_paths(paths) abort
+  for path in filter(copy(a:paths), 'bufexists(v:val)')
+    call defx#util#buffer_delete(bufnr(path))
+  endfor
+endfunction
+
 function! defx#util#_get_preview_window() abort
   " Note: For popup preview feature
   if exists('*popup_findpreview') && popup_findpreview() > 0
@@ -410,9 +434,7 @@ function! defx#util#preview_file(context, filename) abort
   let win_height = winheight(0)
 
   if a:context.vertical_preview
-    call defx#util#execute_path(
-          \ 'silent rightbelow vertical pedit!', a:filename)
-    wincmd P
+    call s:open_preview('silent rightbelow vertical', a:filename)
 
     if a:context.floating_preview && exists('*nvim_win_set_config')
       if a:context['split'] ==# 'floating'
@@ -438,9 +460,7 @@ function! defx#util#preview_file(context, filename) abort
       execute 'vert resize ' . preview_width
     endif
   else
-    call defx#util#execute_path('silent rightbelow pedit!', a:filename)
-
-    wincmd P
+    call s:open_preview('silent rightbelow', a:filename)
 
     if a:context.floating_preview && exists('*nvim_win_set_config')
       let win_row = pos[0] - 1
@@ -470,6 +490,52 @@ function! defx#util#preview_file(context, filename) abort
   endif
 endfunction
 
+function! s:open_preview(command, filename) abort
+  if type(a:filename) != v:t_number
+    call defx#util#execute_path(a:command . ' pedit!', a:filename)
+    wincmd P
+    return
+  endif
+
+  " Reuse the preview window for the buffer
+  let winid = get(filter(map(range(1, winnr('$')), 'win_getid(v:val)'),
+        \ 'getwinvar(v:val, "&previewwindow")'), 0, -1)
+  if winid > 0
+    call win_gotoid(winid)
+    execute 'silent buffer' a:filename
+  else
+    execute a:command 'sbuffer' a:filename
+    setlocal previewwindow
+  endif
+endfunction
+
+function! defx#util#preview_lines(context, filename, lines, binary) abort
+  " Note: The scratch buffer is reused for the previews
+  let bufnr = get(g:, 'defx#_preview_bufnr', -1)
+  if !bufexists(bufnr)
+    let bufnr = bufadd('defx-preview://')
+    call setbufvar(bufnr, '&buftype', 'nofile')
+    call setbufvar(bufnr, '&bufhidden', 'hide')
+    call setbufvar(bufnr, '&swapfile', 0)
+    call bufload(bufnr)
+    call setbufvar(bufnr, '&buflisted', 0)
+    let g:defx#_preview_bufnr = bufnr
+  endif
+
+  call setbufvar(bufnr, '&modifiable', 1)
+  silent call deletebufline(bufnr, 1, '$')
+  call setbufline(bufnr, 1, a:lines)
+  call setbufvar(bufnr, '&modifiable', 0)
+  call setbufvar(bufnr, 'defx_preview_path', a:filename)
+
+  call defx#util#preview_file(a:context, bufnr)
+
+  setlocal filetype=
+  if !a:binary
+    execute 'silent! doautocmd filetypedetect BufRead' fnameescape(a:filename)
+  endif
+endfunction
+
 function! defx#util#close_async_job() abort
   let job = g:defx#_async_job
   if job <= 0
@@ -41,7 +41,7 @@ if hasattr(vim, 'plugin'):
 
         @vim.rpc_export('_defx_async_action', sync=False)  # type: ignore
         def async_action(self, args: Args) -> None:
-            self._rplugin.do_action(args)
+            self._rplugin.async_action(args)
 
         @vim.rpc_export('_defx_get_candidate', sync=True)  # type: ignore
         def get_candidate(self, args: Args) -> Candidate:
@@ -65,6 +65,10 @@ if hasattr(vim, 'plugin'):
         def redraw(self, args: Args) -> None:
             return self._rplugin.redraw(self._rplugin._views)
 
+        @vim.rpc_export('_defx_bulk_rename', sync=True)  # type: ignore
+        def bulk_rename(self, args: Args) -> typing.List[int]:
+            return self._rplugin.bulk_rename(args)
+
 if find_spec('yarp'):
 
     global_rplugin = Rplugin(vim)
@@ -79,7 +83,7 @@ if find_spec('yarp'):
         global_rplugin.do_action(args)
 
     def _defx_async_action(args: Args) -> None:
-        global_rplugin.do_action(args)
+        global_rplugin.async_action(args)
 
     def _defx_get_candidate(args: Args) -> Candidate:
         return global_rplugin.get_candidate()
@@ -95,3 +99,6 @@ if find_spec('yarp'):
 
     def _defx_redraw(args: Args) -> None:
         return global_rplugin.redraw(global_rplugin._views)
+
+    def _defx_bulk_rename(args: Args) -> typing.List[int]:
+        return global_rplugin.bulk_rename(args)
@@ -19,6 +19,8 @@ from defx.clipboard import ClipboardAction
 from defx.context import Context
 from defx.defx import Defx
 from defx.session import Session
+from defx.stats import rpc_stats
+from defx.trace import tracer
 from defx.view import View
 
 Kind = typing.Any
@@ -127,6 +129,12 @@ class Base:
             '.'.join(defx._ignored_files))
         defx._ignored_files = ignored_files.split(',')
 
+    @action(name='cancel_job', attr=ActionAttr.NO_TAGETS)
+    def _cancel_job(self, view: View, defx: Defx, context: Context) -> None:
+        job_id = int(context.args[0]) if context.args else 0
+        for job in view._jobs.cancel(job_id):
+            view.print_msg('Cancel ' + str(job))
+
     @action(name='clear_clipboard', attr=ActionAttr.NO_TAGETS)
     def _clear_clipboard(self, view: View, defx: Defx,
                          context: Context) -> None:
@@ -169,9 +177,11 @@ class Base:
         if not context.session_file or not session_file.exists():
             return
 
-        loaded_session = json.loads(session_file.read_text())
+        text = session_file.read_text()
+        loaded_session = json.loads(text)
         if 'sessions' not in loaded_session:
             return
+        view._session_saved = (text, session_file.stat().st_mtime)
 
         view._sessions = {}
         for path, session in loaded_session['sessions'].items():
@@ -181,6 +191,58 @@ class Base:
             x._asdict() for x in view._sessions.values()
         ]
 
+    @action(name='memory', attr=ActionAttr.NO_TAGETS)
+    def _memory(self, view: View, defx: Defx, context: Context) -> None:
+        """
+        Print the approximate sizes of the structures.  "start" takes the
+        tracemalloc snapshot and "diff" prints the differences from it.
+        """
+        import defx.memory as memory
+        arg = context.args[0] if context.args else ''
+        if arg == 'start':
+            memory.start()
+            view.print_msg('tracemalloc is started')
+            return
+        elif arg == 'stop':
+            memory.stop()
+            return
+        elif arg == 'diff':
+            if not memory.is_tracing():
+                view.print_msg('tracemalloc is not started')
+            for line in memory.diff():
+                view.print_msg(line)
+            return
+
+        import defx.util as util
+        from defx.dirsize import _dirsize
+        from defx.index import _indexes
+        from defx.snapshot import _snapshots
+        items: typing.List[typing.Tuple[str, typing.Any]] = [
+            ('view candidates', view._candidates),
+            ('view sessions', view._sessions),
+            ('view narrow', view._narrow_base),
+            ('view preview', view._preview._cache),
+        ]
+        for x in view._defxs:
+            items += [
+                (f'defx {x._index} cursor history', x._cursor_history),
+                (f'defx {x._index} opened', x._opened_candidates),
+                (f'defx {x._index} selected', x._selected_candidates),
+                (f'defx {x._index} nested', x._nested_candidates),
+            ]
+        items += [
+            ('cache readable', util._readable_cache),
+            ('cache stat', util._stat_cache),
+            ('cache strwidth', util._strwidth_cache),
+            ('cache dirsize', _dirsize._entries if _dirsize else {}),
+            ('cache index', [(x._paths, x._text, x._lower)
+                             for x in _indexes.values()]),
+            ('cache snapshot', [x._dirs for x in _snapshots.values()]),
+            ('traces', tracer().traces()),
+        ]
+        for line in memory.sizes(items):
+            view.print_msg(line)
+
     @action(name='multi')
     def _multi(self, view: View, defx: Defx, context: Context) -> None:
         for arg in context.args:
@@ -196,9 +258,19 @@ class Base:
                       context._replace(args=action_args))
 
     @action(name='check_redraw', attr=ActionAttr.NO_TAGETS)
-    def _nop(self, view: View, defx: Defx, context: Context) -> None:
+    def _check_redraw(self, view: View, defx: Defx, context: Context) -> None:
         pass
 
+    @action(name='narrow', attr=ActionAttr.NO_TAGETS)
+    def _narrow(self, view: View, defx: Defx, context: Context) -> None:
+        if context.args:
+            view.narrow(context.args[0])
+            return
+
+        # Note: The candidates are narrowed while typing
+        query = view._vim.call('defx#util#narrow_input', 'Narrow: ')
+        view.narrow(query)
+
     @action(name='open_tree', attr=ActionAttr.TREE | ActionAttr.CURSOR_TARGET)
     def _open_tree(self, view: View, defx: Defx, context: Context) -> None:
         nested = False
@@ -242,6 +314,24 @@ class Base:
         for target in context.targets:
             view.print_msg(str(target['action__path']))
 
+    @action(name='print_jobs', attr=ActionAttr.NO_TAGETS)
+    def _print_jobs(self, view: View, defx: Defx, context: Context) -> None:
+        jobs = view._jobs.all()
+        if not jobs:
+            view.print_msg('No jobs')
+            return
+        for job in jobs:
+            view.print_msg(str(job))
+
+    @action(name='print_stats', attr=ActionAttr.NO_TAGETS)
+    def _print_stats(self, view: View, defx: Defx, context: Context) -> None:
+        stats = rpc_stats()
+        if context.args and context.args[0] == 'clear':
+            stats.clear()
+            return
+        for line in stats.summary():
+            view.print_msg(line)
+
     @action(name='quit', attr=ActionAttr.NO_TAGETS)
     def _quit(self, view: View, defx: Defx, context: Context) -> None:
         view.quit()
@@ -273,10 +363,22 @@ class Base:
             return
 
         session_file = Path(context.session_file)
-        session_file.write_text(json.dumps({
+        text = json.dumps({
             'version': view._session_version,
             'sessions': {x: y._asdict() for x, y in view._sessions.items()}
-        }))
+        })
+        mtime = (session_file.stat().st_mtime
+                 if session_file.exists() else -1)
+        if view._session_saved == (text, mtime):
+            # Note: The file is not written incrementally.  It is only
+            # skipped if the sessions and the file are not changed.
+            return
+
+        # Note: Write to the temporary file and rename it for atomicity
+        tmp = session_file.with_name(session_file.name + '.tmp')
+        tmp.write_text(text)
+        tmp.replace(session_file)
+        view._session_saved = (text, session_file.stat().st_mtime)
 
     @action(name='search', attr=ActionAttr.NO_TAGETS)
     def _search(self, view: View, defx: Defx, context: Context) -> None:
@@ -308,6 +410,32 @@ class Base:
                     str(search_path.parent), context.cursor)
             view.search_recursive(search_path, defx._index)
 
+    @action(name='trace', attr=ActionAttr.NO_TAGETS)
+    def _trace(self, view: View, defx: Defx, context: Context) -> None:
+        """
+        Print the summary of the traces.  If the argument is "clear",
+        the traces are cleared.  If the argument is "stop", the tracing is
+        stopped.  Otherwise the traces are written to the argument path in
+        Chrome trace event format.
+        """
+        trace = tracer()
+        if not trace.enabled and not trace.traces():
+            view.print_msg('Tracing is disabled.  Use -profile option.')
+            return
+
+        if not context.args:
+            for line in trace.summary():
+                view.print_msg(line)
+        elif context.args[0] == 'clear':
+            trace.clear()
+        elif context.args[0] == 'stop':
+            trace.stop()
+            view.print_msg('Tracing is stopped')
+        else:
+            path = Path(context.args[0]).expanduser()
+            path.write_text(json.dumps(trace.chrome_trace()))
+            view.print_msg(f'Traces are written to "{path}"')
+
     @action(name='toggle_columns', attr=ActionAttr.REDRAW)
     def _toggle_columns(self, view: View, defx: Defx,
                         context: Context) -> None:
@@ -9,7 +9,7 @@ import typing
 
 from abc import ABC, abstractmethod
 from defx.context import Context
-from defx.util import error
+from defx.util import CancelToken, error
 from pathlib import Path
 
 
@@ -32,8 +32,13 @@ class Base(ABC):
 
     @abstractmethod
     def gather_candidates(
-            self, context: Context, path: Path
+            self, context: Context, path: Path,
+            token: typing.Optional[CancelToken] = None
     ) -> typing.List[typing.Dict[str, typing.Any]]:
+        """
+        {token} is given only in the worker threads of the thread safe
+        sources.
+        """
         pass
 
     def debug(self, expr: typing.Any) -> None:
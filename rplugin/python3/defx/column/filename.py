@@ -9,7 +9,8 @@ import typing
 
 from defx.base.column import Base, Highlights
 from defx.context import Context
-from defx.util import Candidate, len_bytes, strwidth
+from defx.util import Candidate, len_bytes, strwidth, strwidths
+from defx.util import MAX_STRWIDTH_CACHE
 from defx.view import View
 
 
@@ -38,6 +39,7 @@ class Column(Base):
         self._context: Context = Context()
         self._directory_marker = '**'
         self._file_marker = '||'
+        self._truncated: typing.Dict[typing.Tuple[str, int], str] = {}
 
     def on_init(self, view: View, context: Context) -> None:
         self._context = context
@@ -66,8 +68,8 @@ class Column(Base):
         return (self._truncate(text), highlights)
 
     def length(self, context: Context) -> int:
-        max_fnamewidth = max([strwidth(self.vim, x['word'])
-                              for x in context.targets])
+        max_fnamewidth = max(strwidths(
+            self.vim, [x['word'] for x in context.targets]))
         max_fnamewidth += context.variable_length
         max_fnamewidth += len(self._file_marker)
         max_width = int(self.vars['max_width'])
@@ -107,8 +109,13 @@ class Column(Base):
         max_length = self._current_length
         if (width > max_length or
                 len(word) != len(bytes(word, 'utf-8', 'surrogatepass'))):
-            return str(self.vim.call(
-                'defx#util#truncate_skipping',
-                word, max_length, int(max_length / 3), '...'))
+            key = (word, max_length)
+            if key not in self._truncated:
+                if len(self._truncated) > MAX_STRWIDTH_CACHE:
+                    self._truncated = {}
+                self._truncated[key] = str(self.vim.call(
+                    'defx#util#truncate_skipping',
+                    word, max_length, int(max_length / 3), '...'))
+            return self._truncated[key]
 
         return word + ' ' * (max_length - width)
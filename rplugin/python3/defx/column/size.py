@@ -9,7 +9,9 @@ import typing
 
 from defx.base.column import Base, Highlights
 from defx.context import Context
-from defx.util import readable, Candidate
+from defx.dirsize import dirsize
+from defx.util import readable, stat, Candidate
+from defx.view import View
 
 
 class Column(Base):
@@ -18,9 +20,14 @@ class Column(Base):
         super().__init__(vim)
 
         self.name = 'size'
+        self.vars = {
+            'directory_size': False,
+        }
         self.has_get_with_highlights = True
 
         self._length = 9
+        self._view: typing.Optional[View] = None
+        self._redraw_pending = False
         self._suffixes = {
             'B': 'Comment',
             'KB': 'Constant',
@@ -33,13 +40,42 @@ class Column(Base):
         self, context: Context, candidate: Candidate
     ) -> typing.Tuple[str, Highlights]:
         path = candidate['action__path']
-        if not readable(path) or path.is_dir():
+        if not readable(path):
             return (' ' * self._length, [])
-        size = self._get_size(path.stat().st_size)
+        if path.is_dir():
+            if not self.vars['directory_size'] or candidate['is_root']:
+                return (' ' * self._length, [])
+
+            total = dirsize().get(path, self._on_update)
+            if total is None:
+                # Not computed yet
+                return ('{:>9s}'.format('...'), [])
+            size = self._get_size(total)
+        else:
+            st = stat(path)
+            if not st:
+                return (' ' * self._length, [])
+            size = self._get_size(st.st_size)
         text = '{:>6s}{:>3s}'.format(size[0], size[1])
         highlight = f'{self.highlight_name}_{size[1]}'
         return (text, [(highlight, self.start, self._length)])
 
+    def on_redraw(self, view: View, context: Context) -> None:
+        self._view = view
+
+    def _on_update(self, path: str) -> None:
+        # Note: It is called in the walker thread
+        if self._redraw_pending or not hasattr(self.vim, 'async_call'):
+            return
+        self._redraw_pending = True
+        self.vim.async_call(self._redraw)
+
+    def _redraw(self) -> None:
+        self._redraw_pending = False
+        view = self._view
+        if view and self.vim.call('bufwinnr', view._bufnr) > 0:
+            view.redraw()
+
     def _get_size(self, size: float) -> typing.Tuple[str, str]:
         multiple = 1024
         suffixes = ['KB', 'MB', 'GB', 'TB']
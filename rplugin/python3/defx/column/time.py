@@ -5,12 +5,13 @@
 # ============================================================================
 
 from pynvim import Nvim
+import re
 import time
 import typing
 
 from defx.base.column import Base, Highlights
 from defx.context import Context
-from defx.util import readable, Candidate
+from defx.util import readable, stat, Candidate
 from defx.view import View
 
 
@@ -26,19 +27,37 @@ class Column(Base):
         self.has_get_with_highlights = True
 
         self._length = 0
+        self._format = ''
+        self._bucket_size = 1
+        self._texts: typing.Dict[int, str] = {}
 
     def on_init(self, view: View, context: Context) -> None:
         self._length = self.vim.call('strwidth',
                                      time.strftime(self.vars['format']))
 
+        if self._format != self.vars['format']:
+            self._format = self.vars['format']
+            self._texts = {}
+            # Note: If the format does not have seconds, the text is
+            # same in the minute.
+            self._bucket_size = 1 if re.search(
+                r'%[-_0^#]*[EO]?[ScsTXr+]', self._format) else 60
+
     def get_with_highlights(
         self, context: Context, candidate: Candidate
     ) -> typing.Tuple[str, Highlights]:
         path = candidate['action__path']
-        if not readable(path):
+        st = stat(path)
+        if not st or not readable(path):
             return (str(' ' * self._length), [])
-        text = time.strftime(self.vars['format'],
-                             time.localtime(path.stat().st_mtime))
+
+        bucket = int(st.st_mtime) // self._bucket_size
+        if bucket not in self._texts:
+            if len(self._texts) > 10000:
+                self._texts = {}
+            self._texts[bucket] = time.strftime(
+                self._format, time.localtime(st.st_mtime))
+        text = self._texts[bucket]
         return (text, [(self.highlight_name, self.start, self._length)])
 
     def length(self, context: Context) -> int:
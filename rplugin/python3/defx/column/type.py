@@ -9,6 +9,7 @@ import typing
 
 from defx.base.column import Base, Highlights
 from defx.context import Context
+from defx.filetype import Classifier
 from defx.util import Candidate, len_bytes
 from defx.view import View
 
@@ -39,29 +40,54 @@ class Column(Base):
         ]
         self.vars = {
             'types': types,
+            'magic': False,
         }
         self.has_get_with_highlights = True
 
         self._length: int = 0
+        self._classifier = Classifier(types)
+        self._view: typing.Optional[View] = None
+        self._redraw_pending = False
 
     def on_init(self, view: View, context: Context) -> None:
         self._length = max([self.vim.call('strwidth', x['icon'])
                             for x in self.vars['types']])
 
+        # Note: The cache is kept while the types are not changed
+        if (self._classifier.types != self.vars['types'] or
+                self._classifier.magic != self.vars['magic']):
+            self._classifier = Classifier(
+                self.vars['types'], bool(self.vars['magic']),
+                self._on_update)
+
     def get_with_highlights(
         self, context: Context, candidate: Candidate
     ) -> typing.Tuple[str, Highlights]:
-        for t in self.vars['types']:
-            for glob in t['globs']:
-                if not candidate['action__path'].match(glob):
-                    continue
-                return (str(t['icon']), [
-                    (f"{self.highlight_name}_{t['name']}",
-                     self.start, len_bytes(t['icon']))
-                ])
+        t = self._classifier.classify(candidate['action__path'])
+        if t:
+            return (str(t['icon']), [
+                (f"{self.highlight_name}_{t['name']}",
+                 self.start, len_bytes(t['icon']))
+            ])
 
         return (' ' * self._length, [])
 
+    def on_redraw(self, view: View, context: Context) -> None:
+        self._view = view
+
+    def _on_update(self, path: str) -> None:
+        # Note: It is called in the sniffer thread
+        if self._redraw_pending or not hasattr(self.vim, 'async_call'):
+            return
+        self._redraw_pending = True
+        self.vim.async_call(self._redraw)
+
+    def _redraw(self) -> None:
+        self._redraw_pending = False
+        view = self._view
+        if view and self.vim.call('bufwinnr', view._bufnr) > 0:
+            view.redraw()
+
     def length(self, context: Context) -> int:
         return self._length
 
@@ -23,11 +23,13 @@ class Context(typing.NamedTuple):
     ignored_files: str = ''
     ignored_recursive_files: str = ''
     listed: bool = False
+    max_cursor_history: int = 0
     new: bool = False
     post_action: str = ''
     prev_bufnr: int = 0
     prev_last_bufnr: int = 0
     prev_winid: int = 0
+    preview_head_size: int = 0
     preview_height: int = 0
     preview_width: int = 0
     profile: bool = False
@@ -36,6 +38,7 @@ class Context(typing.NamedTuple):
     search: str = ''
     search_recursive: str = ''
     session_file: str = ''
+    snapshot_file: str = ''
     show_ignored_files: bool = False
     show_parent: bool = False
     sort: str = ''
@@ -4,17 +4,32 @@
 # License: MIT license
 # ============================================================================
 
+from concurrent.futures import ThreadPoolExecutor
 from pynvim import Nvim
+import os
 import typing
 
 from defx.base.source import Base as Source
 from defx.context import Context
 from defx.sort import sort
-from defx.util import cd, error
+from defx.trace import tracer
+from defx.util import CancelToken, cd, error
 from pathlib import Path
 
 
 Candidate = typing.Dict[str, typing.Any]
+DirectoryStat = typing.Optional[typing.Tuple[int, int]]
+
+
+def directory_stat(path: str) -> DirectoryStat:
+    """
+    Returns the inode and the mtime of {path} or None if it is removed.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns)
 
 
 class Defx(object):
@@ -35,10 +50,13 @@ class Defx(object):
             ',')
         self._cursor_history: typing.Dict[str, Path] = {}
         self._sort_method: str = self._context.sort
-        self._mtime: int = -1
+        # Note: The stats of the gathered directories are compared to
+        # detect the changes.
+        self._directory_stats: typing.Dict[str, DirectoryStat] = {}
         self._opened_candidates: typing.Set[str] = set()
         self._selected_candidates: typing.Set[str] = set()
         self._nested_candidates: typing.Set[str] = set()
+        self._prefetched: typing.Dict[str, typing.List[Candidate]] = {}
 
         self._init_source()
 
@@ -123,17 +141,107 @@ class Defx(object):
                     str(candidate['action__path']), base_level + 1, max_level)
         return ret
 
+    def prefetch(self, paths: typing.List[str],
+                 max_workers: int = 8) -> typing.List[str]:
+        """
+        Gather the candidates of {paths} concurrently.  They are used by
+        the next gathering.  Returns the existing directories in {paths}.
+        """
+        if not self._is_thread_safe():
+            return list(paths)
+        gathered = self.list_directories(paths, max_workers)
+        self._prefetched.update(gathered)
+        return list(gathered.keys())
+
+    def list_directories(
+            self, paths: typing.List[str], max_workers: int = 8,
+            token: typing.Optional[CancelToken] = None
+    ) -> typing.Dict[str, typing.List[Candidate]]:
+        """
+        Returns the candidates of the existing directories in {paths}.
+        They are gathered concurrently.  The directories are skipped after
+        {token} is cancelled.
+        """
+        if not self._is_thread_safe():
+            return {}
+        existing = [x for x in paths
+                    if os.path.isdir(x) and os.access(x, os.R_OK)]
+        if not existing:
+            return {}
+
+        def gather(path: str) -> typing.Optional[typing.List[Candidate]]:
+            if token and token.is_cancelled():
+                return None
+            candidates = self._list_candidates(path, token)
+            return None if token and token.is_cancelled() else candidates
+
+        with ThreadPoolExecutor(
+                max_workers=min(max_workers, len(existing))) as executor:
+            return {x: y for [x, y]
+                    in zip(existing, executor.map(gather, existing))
+                    if y is not None}
+
+    def _is_thread_safe(self) -> bool:
+        # Note: The other sources may call Vim in the threads
+        return bool(self._source) and self._source.name == 'file'
+
+    def update_directory_stat(self, path: str) -> None:
+        """
+        Update the stat of {path} after the tree is patched.
+        """
+        if path in self._directory_stats:
+            self._directory_stats[path] = directory_stat(path)
+
+    def changed_directories(self, stats: typing.Dict[str, DirectoryStat]
+                            ) -> typing.List[str]:
+        """
+        Returns the changed directories in {stats} of the opened
+        directories.  The closed directories are not tracked.
+        """
+        self._directory_stats = {x: y for [x, y]
+                                 in self._directory_stats.items()
+                                 if x in stats}
+        return [x for [x, y] in stats.items()
+                if y and self._directory_stats.get(x, y) != y]
+
     def _gather_candidates(
             self, path: str, base_level: int = 0) -> typing.List[Candidate]:
         """
         Returns file candidates
         """
+        candidates = (self._prefetched.pop(path) if path in self._prefetched
+                      else self._list_candidates(path))
+        for candidate in candidates:
+            candidate['level'] = base_level
+        return candidates
+
+    def _list_candidates(self, path: str,
+                         token: typing.Optional[CancelToken] = None
+                         ) -> typing.List[Candidate]:
         if not self._source:
             return []
 
-        candidates = self._source.gather_candidates(
-            self._context, Path(path))
+        # Note: The stat must be taken before the gathering
+        self._directory_stats[path] = directory_stat(path)
+
+        trace = tracer()
+        with trace.span('gather'):
+            # Note: The other sources may not have {token} argument
+            if token and self._is_thread_safe():
+                candidates = self._source.gather_candidates(
+                    self._context, Path(path), token)
+            else:
+                candidates = self._source.gather_candidates(
+                    self._context, Path(path))
+
+        with trace.span('filter'):
+            candidates = self._filter_candidates(candidates)
+
+        with trace.span('sort'):
+            return sort(self._sort_method, candidates)
 
+    def _filter_candidates(self, candidates: typing.List[Candidate]
+                           ) -> typing.List[Candidate]:
         if self._filtered_files != ['']:
             new_candidates = []
             for candidate in candidates:
@@ -157,6 +265,4 @@ class Defx(object):
             candidate['is_opened_tree'] = False
             candidate['is_root'] = False
             candidate['is_selected'] = False
-            candidate['level'] = base_level
-
-        return sort(self._sort_method, candidates)
+        return candidates
@@ -0,0 +1,224 @@
+# ============================================================================
+# FILE: dirsize.py
+# AUTHOR: Shougo Matsushita <Shougo.Matsu at gmail.com>
+# License: MIT license
+# ============================================================================
+
+from pathlib import Path
+import json
+import os
+import queue
+import threading
+import time
+import typing
+
+Callback = typing.Callable[[str], None]
+
+# The totals are validated again after the interval
+VALIDATE_INTERVAL = 10.0
+# The maximum directories in the cache.  The least recently checked
+# directories are removed.
+MAX_ENTRIES = 100000
+
+
+class DirSize(object):
+    """
+    The recursive directory sizes computed by the background walker.
+
+    The cache entry of the directory is keyed by (inode, mtime).  It has
+    the total size of the files directly in the directory and the
+    subdirectories.  Only the changed directories are scanned again.
+    The totals of the subdirectories are validated once per interval even
+    if the parents are walked.  The entries are saved in {cache_file}.
+    """
+
+    def __init__(self, cache_file: Path) -> None:
+        self._cache_file = cache_file
+        self._entries: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+        self._totals: typing.Dict[str, typing.Tuple[int, float]] = {}
+        self._pending: typing.Set[str] = set()
+        self._queue: queue.Queue[typing.Tuple[
+            str, typing.Optional[Callback]]] = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: typing.Optional[threading.Thread] = None
+        self._loaded = False
+
+    def get(self, path: Path, on_update: typing.Optional[Callback] = None
+            ) -> typing.Optional[int]:
+        """
+        Returns the total size of {path}.  If it is not computed or
+        outdated, {path} is walked in the background and {on_update} is
+        called in the walker thread if the total is changed.
+        """
+        key = str(path)
+        with self._lock:
+            total = self._totals.get(key, None)
+            if total and time.time() - total[1] < VALIDATE_INTERVAL:
+                return total[0]
+            if key not in self._pending:
+                self._pending.add(key)
+                self._queue.put((key, on_update))
+
+        if not self._thread:
+            self._thread = threading.Thread(target=self._work, daemon=True)
+            self._thread.start()
+        return total[0] if total else None
+
+    def cached(self, path: Path) -> typing.Optional[int]:
+        with self._lock:
+            total = self._totals.get(str(path), None)
+        return total[0] if total else None
+
+    def _work(self) -> None:
+        while True:
+            [key, on_update] = self._queue.get()
+            if not self._loaded:
+                self._load()
+
+            try:
+                size = self._walk(key)
+            except OSError:
+                size = 0
+            with self._lock:
+                prev = self._totals.get(key, None)
+                self._totals[key] = (size, time.time())
+                self._pending.discard(key)
+
+            if self._queue.empty():
+                self._save()
+            if on_update and (not prev or prev[0] != size):
+                on_update(key)
+
+    def _walk(self, root: str) -> int:
+        """
+        Returns the total size of {root}.  The deep trees are walked by
+        the stack.
+        """
+        now = time.time()
+        totals: typing.Dict[str, int] = {}
+        stack = [(root, False)]
+        while stack:
+            [path, is_scanned] = stack.pop()
+            entry = self._entries.get(path, None)
+            if is_scanned:
+                size = int(entry['files']) + sum(
+                    [totals.get(x, 0) for x in entry['dirs']]) if entry else 0
+                totals[path] = size
+                if path != root:
+                    with self._lock:
+                        self._totals[path] = (size, now)
+                continue
+
+            with self._lock:
+                total = self._totals.get(path, None)
+            if (path != root and total and
+                    now - total[1] < VALIDATE_INTERVAL):
+                # Validated by the other walk
+                totals[path] = total[0]
+                continue
+
+            entry = self._validate(path, entry)
+            if not entry:
+                totals[path] = 0
+                continue
+            entry['checked'] = now
+            stack.append((path, True))
+            stack += [(x, False) for x in entry['dirs']]
+        return totals[root]
+
+    def _validate(self, path: str,
+                  entry: typing.Optional[typing.Dict[str, typing.Any]]
+                  ) -> typing.Optional[typing.Dict[str, typing.Any]]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            # Removed directory
+            self._entries.pop(path, None)
+            return None
+
+        if (not entry or entry['ino'] != st.st_ino or
+                entry['mtime'] != st.st_mtime):
+            try:
+                entry = self._scan(path, st)
+            except OSError:
+                return None
+        return entry
+
+    def _scan(self, path: str, st: os.stat_result
+              ) -> typing.Dict[str, typing.Any]:
+        files = 0
+        dirs: typing.List[str] = []
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        dirs.append(entry.path)
+                    else:
+                        files += entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    continue
+        scanned = {
+            'ino': st.st_ino, 'mtime': st.st_mtime,
+            'files': files, 'dirs': dirs,
+        }
+
+        # Forget the removed subtrees
+        prev = self._entries.get(path, None)
+        for removed in set(prev['dirs'] if prev else []) - set(dirs):
+            for key in [x for x in self._entries
+                        if x == removed or x.startswith(removed + os.sep)]:
+                self._entries.pop(key)
+
+        self._entries[path] = scanned
+        return scanned
+
+    def _load(self) -> None:
+        self._loaded = True
+        try:
+            self._entries = json.loads(self._cache_file.read_text())
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def _save(self) -> None:
+        if len(self._entries) > MAX_ENTRIES:
+            keys = sorted(self._entries.keys(),
+                          key=lambda x: self._entries[x].get('checked', 0))
+            for key in keys[: len(keys) - MAX_ENTRIES]:
+                self._entries.pop(key)
+        with self._lock:
+            if len(self._totals) > MAX_ENTRIES:
+                keys = sorted(self._totals.keys(),
+                              key=lambda x: self._totals[x][1])
+                for key in keys[: len(keys) - MAX_ENTRIES]:
+                    self._totals.pop(key)
+
+        # Note: Write to the temporary file and rename it for atomicity
+        tmp = self._cache_file.with_name(self._cache_file.name + '.tmp')
+        try:
+            self._cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(self._entries))
+            tmp.replace(self._cache_file)
+        except OSError:
+            pass
+
+
+_dirsize: typing.Optional[DirSize] = None
+
+
+def dirsize() -> DirSize:
+    """
+    Returns the directory sizes shared by defx buffers.
+    """
+    global _dirsize
+    if not _dirsize:
+        cache_home = os.environ.get(
+            'XDG_CACHE_HOME', str(Path.home().joinpath('.cache')))
+        _dirsize = DirSize(Path(cache_home).joinpath('defx', 'dirsize.json'))
+    return _dirsize
+
+
+def cached_size(path: Path) -> typing.Optional[int]:
+    """
+    Returns the computed total size of {path} if it exists.
+    """
+    return _dirsize.cached(path) if _dirsize else None
@@ -0,0 +1,184 @@
+# ============================================================================
+# FILE: executor.py
+# AUTHOR: Shougo Matsushita <Shougo.Matsu at gmail.com>
+# License: MIT license
+# ============================================================================
+
+from concurrent.futures import Future
+from pathlib import Path
+from pynvim import Nvim
+import queue
+import threading
+import typing
+
+from defx.defx import Candidate, Defx
+from defx.util import CancelToken
+from defx.view import View
+
+Gathered = typing.Dict[str, typing.List[Candidate]]
+DoAction = typing.Callable[[View, typing.List[typing.Any]], None]
+
+
+class Request(object):
+    """
+    The async action request.  [action_name, action_args, context] is
+    {args}.
+    """
+
+    def __init__(self, view: View, args: typing.List[typing.Any]) -> None:
+        self.view = view
+        self.args = args
+        self.token = CancelToken()
+        self.future: typing.Optional[Future[Gathered]] = None
+        self.defx: typing.Optional[Defx] = None
+        self.paths: typing.List[str] = []
+        # The requests of the same key are superseded by the latest one
+        self.key = ''
+        # The current directory after "cd" request
+        self.cwd = ''
+
+
+class ActionExecutor(object):
+    """
+    Do the async actions in the order per view.  The directories of the
+    actions are gathered by the worker thread before the actions are done
+    in the main thread.
+
+    The latest "cd" and "open_tree" for the same target cancel the
+    previous requests of the view.
+    """
+
+    def __init__(self, vim: Nvim, do_action: DoAction) -> None:
+        self._vim = vim
+        self._do_action = do_action
+        self._requests: typing.Dict[View, typing.List[Request]] = {}
+        self._queue: queue.Queue[Request] = queue.Queue()
+        self._worker: typing.Optional[threading.Thread] = None
+        # The views in _run()
+        self._running: typing.Set[View] = set()
+
+    def submit(self, view: View, args: typing.List[typing.Any]) -> None:
+        requests = self._requests.setdefault(view, [])
+        request = Request(view, args)
+        self._plan(request, requests)
+        if request.key:
+            for prev in [x for x in requests if x.key == request.key]:
+                prev.token.cancel()
+        requests.append(request)
+
+        if not hasattr(self._vim, 'async_call'):
+            self.flush(view)
+            return
+
+        request.future = Future()
+        request.future.add_done_callback(
+            lambda x: self._vim.async_call(self._run, view, False))
+        if not self._worker:
+            self._worker = threading.Thread(target=self._work, daemon=True)
+            self._worker.start()
+        self._queue.put(request)
+
+    def flush(self, view: View) -> None:
+        """
+        Do the pending requests of {view} now.  It is called before the
+        sync actions to keep the order.
+        """
+        self._run(view, True)
+
+    def cancel(self, view: View) -> None:
+        for request in self._requests.pop(view, []):
+            request.token.cancel()
+
+    def _plan(self, request: Request,
+              requests: typing.List[Request]) -> None:
+        """
+        Set the directories to gather and the key of {request}.
+        """
+        [action_name, action_args, context] = request.args
+        view = request.view
+        candidate = view.get_cursor_candidate(context['cursor'])
+        if not candidate or not view._defxs:
+            return
+        defx = view._defxs[candidate['_defx_index']]
+        if defx._source.name != 'file':
+            return
+        request.defx = defx
+
+        if action_name == 'open_tree' and not action_args:
+            if candidate['is_directory'] and not candidate['is_opened_tree']:
+                target = str(candidate['action__path'])
+                request.paths = [target]
+                request.key = f'open_tree:{defx._index}:{target}'
+            return
+
+        # Note: The other pending actions may change the directory.
+        if (action_name != 'cd' or len(action_args) > 1 or
+                [x for x in requests if not x.key]):
+            return
+
+        cds = [x for x in requests if x.cwd and x.defx == defx]
+        cwd = Path(cds[-1].cwd if cds else defx._cwd)
+        if not action_args:
+            path = Path.home()
+        elif action_args[0] == '..':
+            path = cwd.parent
+        else:
+            path = cwd.joinpath(action_args[0]).resolve()
+        if not path.is_dir():
+            return
+
+        request.paths = [str(path)]
+        request.cwd = str(path)
+        request.key = f'cd:{defx._index}'
+        if cds:
+            # Note: The previous directory may be superseded.
+            request.args = [action_name, [str(path)], context]
+
+    def _work(self) -> None:
+        while True:
+            request = self._queue.get()
+            future = request.future
+            if not future:
+                continue
+            try:
+                if request.token.is_cancelled() or not request.defx:
+                    future.set_result({})
+                else:
+                    future.set_result(request.defx.list_directories(
+                        request.paths, token=request.token))
+            except Exception as e:
+                future.set_exception(e)
+
+    def _run(self, view: View, wait: bool) -> None:
+        # Note: pynvim handles the notifications while the action waits
+        # for Vim.  The active loop does the next requests.
+        if view in self._running:
+            return
+        self._running.add(view)
+        try:
+            self._run_requests(view, wait)
+        finally:
+            self._running.discard(view)
+
+    def _run_requests(self, view: View, wait: bool) -> None:
+        requests = self._requests.get(view, [])
+        while requests:
+            request = requests[0]
+            if (not wait and not request.token.is_cancelled() and
+                    request.future and not request.future.done()):
+                return
+            requests.pop(0)
+            if request.token.is_cancelled():
+                continue
+
+            gathered = (request.future.result()
+                        if request.future else {})
+            if request.defx:
+                request.defx._prefetched.update(gathered)
+            try:
+                self._do_action(view, request.args)
+            finally:
+                if request.defx:
+                    for path in gathered:
+                        request.defx._prefetched.pop(path, None)
+        self._requests.pop(view, None)
@@ -0,0 +1,207 @@
+# ============================================================================
+# FILE: filetype.py
+# AUTHOR: Shougo Matsushita <Shougo.Matsu at gmail.com>
+# License: MIT license
+# ============================================================================
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import fnmatch
+import mimetypes
+import re
+import threading
+import typing
+
+# The file head signatures and the type names
+MAGICS: typing.List[typing.Tuple[bytes, str]] = [
+    (b'\x89PNG\r\n\x1a\n', 'image'),
+    (b'\xff\xd8\xff', 'image'),
+    (b'GIF8', 'image'),
+    (b'PK\x03\x04', 'archive'),
+    (b'\x1f\x8b', 'archive'),
+    (b'\x7fELF', 'executable'),
+    (b'MZ', 'executable'),
+    (b'#!', 'executable'),
+]
+MAGIC_SIZE = max([len(x[0]) for x in MAGICS])
+
+# The maximum entries of the name and the magic caches
+MAX_CACHE = 10000
+
+OnUpdate = typing.Callable[[str], None]
+
+_image_extensions: typing.Set[str] = set()
+
+# The LRU cache of the sniffed type names by the path
+_sniffed: typing.OrderedDict[str, str] = OrderedDict()
+_sniffed_lock = threading.Lock()
+
+
+def is_image(path: Path) -> bool:
+    """
+    Check the image file by the extension.  The file without the
+    extension is checked by the magic bytes.
+    """
+    if not _image_extensions:
+        mimetypes.init()
+        _image_extensions.update([
+            ext for [ext, mime] in mimetypes.types_map.items()
+            if mime.startswith('image/')])
+    if '.' in path.name:
+        return path.suffix.lower() in _image_extensions
+
+    name = get_sniffed(str(path))
+    if name is None:
+        name = sniff(path)
+        set_sniffed(str(path), name)
+    return name == 'image'
+
+
+def sniff(path: Path) -> str:
+    """
+    Returns the type name by the magic bytes.
+    """
+    try:
+        with path.open('rb') as f:
+            head = f.read(MAGIC_SIZE)
+    except OSError:
+        return ''
+    for [magic, name] in MAGICS:
+        if head.startswith(magic):
+            return name
+    return ''
+
+
+def get_sniffed(key: str) -> typing.Optional[str]:
+    with _sniffed_lock:
+        if key not in _sniffed:
+            return None
+        _sniffed.move_to_end(key)
+        return _sniffed[key]
+
+
+def set_sniffed(key: str, name: str) -> None:
+    with _sniffed_lock:
+        _sniffed[key] = name
+        _sniffed.move_to_end(key)
+        if len(_sniffed) > MAX_CACHE:
+            _sniffed.popitem(last=False)
+
+
+class Classifier(object):
+    """
+    Classify the file names by the types definition.
+
+    "*.ext" globs are looked up by the extension dict and the literal
+    names by the name dict.  Other globs are compiled into one regex.
+    The results are cached by the name in the LRU order.
+
+    {on_update} is called in the sniffer thread when the magic bytes
+    change the type of the path.
+    """
+
+    def __init__(self, types: typing.List[typing.Dict[str, typing.Any]],
+                 magic: bool = False,
+                 on_update: typing.Optional[OnUpdate] = None) -> None:
+        self.types = types
+        self._names: typing.Dict[str, int] = {}
+        self._extensions: typing.Dict[str, int] = {}
+        self._paths: typing.List[typing.Tuple[str, int]] = []
+        self._cache: typing.OrderedDict[str, int] = OrderedDict()
+
+        patterns: typing.List[str] = []
+        self._groups: typing.List[int] = []
+        for [index, t] in enumerate(types):
+            for glob in t['globs']:
+                if '/' in glob:
+                    self._paths.append((glob, index))
+                elif not re.search(r'[*?\[]', glob):
+                    self._names.setdefault(glob, index)
+                elif glob.startswith('*.') and not re.search(
+                        r'[*?\[]', glob[2:]):
+                    self._extensions.setdefault(glob[2:], index)
+                else:
+                    patterns.append(fnmatch.translate(glob))
+                    self._groups.append(index)
+        self._fallback: typing.Optional[typing.Pattern[str]] = (
+            re.compile('|'.join([f'({x})' for x in patterns]))
+            if patterns else None)
+
+        self.magic = magic
+        self.magic_types = {x['name']: i for [i, x] in enumerate(types)}
+        self._on_update = on_update
+        self._sniffing: typing.Set[str] = set()
+        self._lock = threading.Lock()
+        self._executor: typing.Optional[ThreadPoolExecutor] = None
+
+    def classify(self, path: Path) -> typing.Optional[
+            typing.Dict[str, typing.Any]]:
+        name = path.name
+        if name in self._cache:
+            self._cache.move_to_end(name)
+            index = self._cache[name]
+        else:
+            index = self._classify_name(name)
+            self._cache[name] = index
+            if len(self._cache) > MAX_CACHE:
+                self._cache.popitem(last=False)
+
+        if self._paths:
+            for [glob, path_index] in self._paths:
+                if (index < 0 or path_index < index) and path.match(glob):
+                    index = path_index
+                    break
+
+        if index < 0 and self.magic and '.' not in name:
+            index = self._sniff(path)
+
+        return self.types[index] if index >= 0 else None
+
+    def _classify_name(self, name: str) -> int:
+        indexes: typing.List[int] = []
+        if name in self._names:
+            indexes.append(self._names[name])
+
+        # Check "a.tar.gz" by "tar.gz" and "gz"
+        pos = name.find('.')
+        while pos >= 0:
+            ext = name[pos + 1:]
+            if ext in self._extensions:
+                indexes.append(self._extensions[ext])
+            pos = name.find('.', pos + 1)
+
+        if self._fallback:
+            match = self._fallback.match(name)
+            if match and match.lastindex:
+                # Note: fnmatch.translate() does not have capture groups
+                indexes.append(self._groups[match.lastindex - 1])
+
+        return min(indexes) if indexes else -1
+
+    def _sniff(self, path: Path) -> int:
+        """
+        The magic bytes are read in the background.  The result is used
+        in the next redraw.
+        """
+        key = str(path)
+        name = get_sniffed(key)
+        if name is not None:
+            return self.magic_types.get(name, -1)
+        with self._lock:
+            if key in self._sniffing:
+                return -1
+            self._sniffing.add(key)
+
+        if not self._executor:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+        self._executor.submit(self._sniff_path, path)
+        return -1
+
+    def _sniff_path(self, path: Path) -> None:
+        name = sniff(path)
+        set_sniffed(str(path), name)
+        with self._lock:
+            self._sniffing.discard(str(path))
+        if self._on_update and name in self.magic_types:
+            self._on_update(str(path))
@@ -0,0 +1,208 @@
+# ============================================================================
+# FILE: index.py
+# AUTHOR: Shougo Matsushita <Shougo.Matsu at gmail.com>
+# License: MIT license
+# ============================================================================
+
+from bisect import bisect_right
+from pathlib import Path
+import hashlib
+import json
+import os
+import re
+import threading
+import typing
+
+# The directories which are not indexed
+SKIP_DIRS = {'.git', '.hg', '.svn'}
+
+# [mtime, files, directories]
+DirEntry = typing.List[typing.Any]
+Callback = typing.Callable[['FileIndex'], None]
+
+
+class FileIndex(object):
+    """
+    The filename index of {root}.
+
+    The entries are the directory names and the mtimes.  The update
+    scans the changed directories only and it is saved in
+    {cache_file}.  The paths are joined into one text to search them
+    by str.find() and re.
+    """
+
+    def __init__(self, root: Path, cache_file: Path) -> None:
+        self.root = root
+        self.is_loaded = False
+        self._cache_file = cache_file
+        self._dirs: typing.Dict[str, DirEntry] = {}
+        self._paths: typing.List[str] = []
+        self._text = ''
+        self._lower = ''
+        self._starts: typing.List[int] = []
+        self._lock = threading.Lock()
+        self._thread: typing.Optional[threading.Thread] = None
+
+    def load(self) -> None:
+        self.is_loaded = True
+        try:
+            self._dirs = json.loads(self._cache_file.read_text())
+        except (OSError, ValueError):
+            return
+        self._build()
+
+    def is_running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def update(self, on_done: typing.Optional[Callback] = None) -> None:
+        """
+        Update the index in the background.
+        """
+        if self.is_running():
+            return
+        self._thread = threading.Thread(
+            target=self.run, args=(on_done,), daemon=True)
+        self._thread.start()
+
+    def run(self, on_done: typing.Optional[Callback] = None) -> None:
+        if not self.is_loaded:
+            self.load()
+
+        dirs: typing.Dict[str, DirEntry] = {}
+        stack = ['']
+        while stack:
+            rel = stack.pop()
+            path = os.path.join(str(self.root), rel)
+            try:
+                mtime = os.stat(path).st_mtime
+            except OSError:
+                continue
+            entry = self._dirs.get(rel, None)
+            if not entry or entry[0] != mtime:
+                entry = self._scan(path, mtime)
+            dirs[rel] = entry
+            stack += [os.path.join(rel, x) for x in entry[2]]
+
+        # Note: The removed directories are not in {dirs}
+        self._dirs = dirs
+        self._build()
+        self._save()
+        if on_done:
+            on_done(self)
+
+    def find(self, query: str, max_results: int = 100) -> typing.List[Path]:
+        """
+        Returns the paths which contain {query}, then the paths which
+        match {query} by fuzzy.  It is smart case.
+        """
+        ignorecase = not re.search(r'[A-Z]', query)
+        with self._lock:
+            text = self._lower if ignorecase else self._text
+            starts = self._starts
+            paths = self._paths
+        if not query or not text:
+            return []
+
+        def in_basename(line: int) -> bool:
+            name = os.path.basename(paths[line].rstrip('/'))
+            return query in (name.lower() if ignorecase else name)
+
+        found: typing.List[int] = []
+        pos = text.find(query)
+        while pos >= 0 and len(found) < max_results * 10:
+            line = bisect_right(starts, pos) - 1
+            found.append(line)
+            pos = text.find(query, starts[line + 1]
+                            if line + 1 < len(starts) else len(text))
+
+        # The basename matches first
+        found.sort(key=lambda x: (not in_basename(x), len(paths[x])))
+
+        if len(found) < max_results:
+            # Note: "a[^\nb]*b" does not backtrack
+            pattern = re.compile(re.escape(query[0]) + ''.join([
+                '[^\n{0}]*{0}'.format(re.escape(x)) for x in query[1:]]))
+            matched = set(found)
+            fuzzy: typing.List[int] = []
+            pos = 0
+            while len(fuzzy) < max_results - len(found):
+                match = pattern.search(text, pos)
+                if not match:
+                    break
+                line = bisect_right(starts, match.start()) - 1
+                if line not in matched:
+                    fuzzy.append(line)
+                pos = (starts[line + 1]
+                       if line + 1 < len(starts) else len(text))
+            found += sorted(fuzzy, key=lambda x: len(paths[x]))
+
+        return [self.root.joinpath(paths[x]) for x in found[: max_results]]
+
+    def _scan(self, path: str, mtime: float) -> DirEntry:
+        files: typing.List[str] = []
+        dirs: typing.List[str] = []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in SKIP_DIRS:
+                                dirs.append(entry.name)
+                        else:
+                            files.append(entry.name)
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return [mtime, files, dirs]
+
+    def _build(self) -> None:
+        paths: typing.List[str] = []
+        for [rel, entry] in self._dirs.items():
+            paths += [os.path.join(rel, x) + '/' for x in entry[2]]
+            paths += [os.path.join(rel, x) for x in entry[1]]
+
+        # Note: The texts are joined by "\n".  File names with "\n" are
+        # not found.
+        starts: typing.List[int] = []
+        offset = 0
+        for path in paths:
+            starts.append(offset)
+            offset += len(path) + 1
+        text = '\n'.join(paths)
+        lower = '\n'.join([x.lower() for x in paths])
+        if len(lower) != len(text):
+            # Unicode lower() may change the length
+            lower = text
+
+        with self._lock:
+            self._paths = paths
+            self._starts = starts
+            self._text = text
+            self._lower = lower
+
+    def _save(self) -> None:
+        tmp = self._cache_file.with_name(self._cache_file.name + '.tmp')
+        try:
+            self._cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(self._dirs))
+            tmp.replace(self._cache_file)
+        except OSError:
+            pass
+
+
+_indexes: typing.Dict[str, FileIndex] = {}
+
+
+def file_index(root: Path) -> FileIndex:
+    """
+    Returns the index of {root} shared by defx buffers.
+    """
+    key = str(root)
+    if key not in _indexes:
+        cache_home = os.environ.get(
+            'XDG_CACHE_HOME', str(Path.home().joinpath('.cache')))
+        _indexes[key] = FileIndex(root, Path(cache_home).joinpath(
+            'defx', 'index',
+            hashlib.sha1(key.encode('utf-8')).hexdigest() + '.json'))
+    return _indexes[key]
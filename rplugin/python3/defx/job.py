@@ -0,0 +1,220 @@
+# ============================================================================
+# FILE: job.py
+# AUTHOR: Shougo Matsushita <Shougo.Matsu at gmail.com>
+# License: MIT license
+# ============================================================================
+
+from pathlib import Path
+import threading
+import time
+import typing
+
+from defx.transfer import format_size
+
+Callback = typing.Callable[['Job'], None]
+# The job, the jobs to wait and the callback
+Pending = typing.Tuple['Job', typing.List['Job'], typing.Optional[Callback]]
+
+
+class Job(object):
+    """
+    The background job.  {func} is called in the worker thread.
+
+    {func} should update the progress counters, call notify() and check
+    is_cancelled() between the items.  {paths} are the sources and the
+    destinations.  The job without {paths} depends on all jobs.
+    """
+
+    def __init__(self, name: str, description: str,
+                 func: typing.Callable[['Job'], None],
+                 paths: typing.Optional[typing.List[Path]] = None) -> None:
+        self.id = 0
+        self.name = name
+        self.description = description
+        self.paths = paths or []
+        self.status = 'queued'
+        self.errors: typing.List[str] = []
+        self.started = 0.0
+        self.finished = 0.0
+        self.files_done = 0
+        self.files_total = 0
+        self.bytes_done = 0
+        self.bytes_total = 0
+
+        self._func = func
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+        self._on_progress: typing.Optional[Callback] = None
+        self._interval = 0.5
+        self._notified = 0.0
+
+    def run(self, on_done: typing.Optional[Callback] = None) -> None:
+        # Note: {func} is called even if the job is cancelled while
+        # queued.  It may need to restore the state.
+        self.status = 'running'
+        self.started = time.time()
+        try:
+            self._func(self)
+        except Exception as e:
+            self.errors.append(str(e))
+        self.finished = time.time()
+        if self.is_cancelled():
+            self.status = 'cancelled'
+        elif self.errors:
+            self.status = 'failed'
+        else:
+            self.status = 'done'
+        self._done.set()
+        if on_done:
+            on_done(self)
+
+    def wait(self, timeout: typing.Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    def overlaps(self, job: 'Job') -> bool:
+        """
+        Check the paths of {job} are the same or the ancestors or the
+        descendants of the paths.
+        """
+        if not self.paths or not job.paths:
+            return True
+        for path in self.paths:
+            for other in job.paths:
+                if (path == other or path in other.parents or
+                        other in path.parents):
+                    return True
+        return False
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def is_running(self) -> bool:
+        return self.status in ['queued', 'running']
+
+    def set_progress(self, on_progress: typing.Optional[Callback],
+                     interval: float = 0.5) -> None:
+        self._on_progress = on_progress
+        self._interval = interval
+
+    def notify(self) -> None:
+        """
+        Call the progress callback.  It is throttled by the interval.
+        """
+        now = time.time()
+        if not self._on_progress or now - self._notified < self._interval:
+            return
+        self._notified = now
+        self._on_progress(self)
+
+    def elapsed(self) -> float:
+        if not self.started:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    def throughput(self) -> typing.Tuple[float, float]:
+        """
+        Returns (bytes per second, files per second).
+        """
+        elapsed = self.elapsed()
+        if elapsed <= 0:
+            return (0.0, 0.0)
+        return (self.bytes_done / elapsed, self.files_done / elapsed)
+
+    def metrics(self) -> str:
+        [bytes_rate, files_rate] = self.throughput()
+        metrics = f'{self.files_done}/{self.files_total} files'
+        if self.bytes_total:
+            metrics += ' {}/{} {}/s'.format(
+                format_size(self.bytes_done), format_size(self.bytes_total),
+                format_size(bytes_rate))
+        return metrics + f' {files_rate:.1f} files/s'
+
+    def __str__(self) -> str:
+        return '{:>3} {:<8} {:<9} {:6.1f}s {} {}'.format(
+            self.id, self.name, self.status, self.elapsed(),
+            self.metrics(), self.description)
+
+
+class Jobs(object):
+    """
+    The job scheduler shared by defx buffers.
+
+    The jobs are queued and started by {workers} worker threads in the
+    order.  The job is started after the previous jobs of the overlapped
+    paths are finished.  The other jobs are started before it.
+    """
+
+    def __init__(self, workers: int = 2, history: int = 20) -> None:
+        self._jobs: typing.List[Job] = []
+        self._workers: typing.List[threading.Thread] = []
+        self._max_workers = workers
+        self._history = history
+        self._pending: typing.List[Pending] = []
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._last_id = 0
+
+    def start(self, job: Job,
+              on_done: typing.Optional[Callback] = None) -> Job:
+        with self._lock:
+            # Forget the old finished jobs
+            finished = [x for x in self._jobs if not x.is_running()]
+            for old in finished[: max(
+                    0, len(finished) - self._history + 1)]:
+                self._jobs.remove(old)
+
+            self._last_id += 1
+            job.id = self._last_id
+            depends = [x for x in self._jobs
+                       if x.is_running() and x.overlaps(job)]
+            self._jobs.append(job)
+
+            if len(self._workers) < self._max_workers:
+                worker = threading.Thread(target=self._work, daemon=True)
+                self._workers.append(worker)
+                worker.start()
+
+            self._pending.append((job, depends, on_done))
+            self._changed.notify_all()
+        return job
+
+    def cancel(self, job_id: int = 0) -> typing.List[Job]:
+        """
+        Cancel the job.  If {job_id} is 0, cancel all jobs.
+        """
+        jobs = [x for x in self.running() if not job_id or x.id == job_id]
+        for job in jobs:
+            job.cancel()
+        return jobs
+
+    def running(self) -> typing.List[Job]:
+        with self._lock:
+            return [x for x in self._jobs if x.is_running()]
+
+    def all(self) -> typing.List[Job]:
+        with self._lock:
+            return list(self._jobs)
+
+    def _work(self) -> None:
+        while True:
+            with self._changed:
+                pending = self._next()
+                while not pending:
+                    self._changed.wait()
+                    pending = self._next()
+                self._pending.remove(pending)
+
+            [job, _, on_done] = pending
+            job.run(on_done)
+            with self._changed:
+                self._changed.notify_all()
+
+    def _next(self) -> typing.Optional[Pending]:
+        # Note: The depended jobs are always queued before the job.
+        for pending in self._pending:
+            if not [x for x in pending[1] if x.is_running()]:
+                return pending
+        return None
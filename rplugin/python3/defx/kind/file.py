@@ -7,10 +7,10 @@
 from pathlib import Path
 from pynvim import Nvim
 import importlib
-import mimetypes
 import os
 import shutil
 import subprocess
+import tempfile
 import typing
 
 from defx.action import ActionAttr
@@ -19,10 +19,17 @@ from defx.kind.filelike import Kind as Base
 from defx.clipboard import ClipboardAction
 from defx.context import Context
 from defx.defx import Defx
+from defx.filetype import is_image
+from defx.index import file_index
+from defx.job import Job
+from defx.preview import image_preview
 from defx.util import cd, confirm, error, Candidate
+from defx.transfer import Transfer
 from defx.util import readable
 from defx.view import View
 
+STAGING_PREFIX = '.defx-remove-'
+
 
 class Kind(Base):
 
@@ -47,15 +54,35 @@ class Kind(Base):
 
     def preview_file(self, view: View, defx: Defx, context: Context,
                      candidate: Candidate) -> None:
-        filepath = str(candidate['action__path'])
-        guess_type = mimetypes.guess_type(filepath)[0]
-        if (guess_type and guess_type.startswith('image/') and
-                shutil.which('ueberzug') and shutil.which('bash')):
+        if (is_image(candidate['action__path']) and
+                shutil.which('ueberzug')):
             self._preview_image(view, defx, context, candidate)
             return
 
         super().preview_file(view, defx, context, candidate)
 
+    def open_preview(self, view: View, context: Context,
+                     candidate: Candidate) -> None:
+        path = candidate['action__path']
+        if (not context.preview_head_size or
+                view._vim.call('buflisted', str(path)) or
+                not path.is_file()):
+            super().open_preview(view, context, candidate)
+            return
+
+        # Note: Only the head of the file is loaded in the scratch buffer
+        # to preview the large files.
+        try:
+            [lines, binary] = view._preview.get(
+                path, context.preview_head_size)
+        except OSError as e:
+            error(view._vim, str(e))
+            return
+        view._vim.call('defx#util#preview_lines',
+                       context._replace(targets=[])._asdict(),
+                       str(path), lines, binary)
+        view._vim.current.window.options['foldenable'] = False
+
     def paste(self, view: View, src: Path, dest: Path,
               cwd: str) -> None:
         if view._clipboard.source_name != 'file':
@@ -89,6 +116,155 @@ class Kind(Base):
                 dest.symlink_to(src,
                                 target_is_directory=src.is_dir())
 
+    def paste_targets(self, view: View, defx: Defx, targets: typing.List[
+            typing.Tuple[Path, Path, bool]], cwd: str) -> None:
+        action = view._clipboard.action
+        if (view._clipboard.source_name != 'file' or not targets or
+                action not in [ClipboardAction.COPY, ClipboardAction.MOVE]):
+            super().paste_targets(view, defx, targets, cwd)
+            return
+
+        # Note: The conflicts are already resolved by the caller.  The
+        # copy and move are executed by the job scheduler to keep Vim
+        # responsive.
+        paths = [x[0] for x in targets] + [x[1] for x in targets]
+        if action == ClipboardAction.COPY:
+            job = Job('copy', self._job_description([x[0] for x in targets]),
+                      lambda x: self._copy_job(x, targets), paths)
+        else:
+            job = Job('move', self._job_description([x[0] for x in targets]),
+                      lambda x: self._move_job(x, targets), paths)
+            # Clear clipboard after action
+            view._clipboard.action = ClipboardAction.NONE
+            view._clipboard.candidates = []
+
+        self.start_job(view, job, lambda x: self._paste_finished(
+            view, defx, action, targets, x))
+
+    def _copy_job(self, job: Job, targets: typing.List[
+            typing.Tuple[Path, Path, bool]]) -> None:
+        def on_progress(transfer: Transfer) -> None:
+            if job.is_cancelled():
+                transfer.cancel()
+            job.files_done = transfer.files_done
+            job.files_total = transfer.files_total
+            job.bytes_done = transfer.bytes_done
+            job.bytes_total = transfer.bytes_total
+            job.notify()
+
+        transfer = Transfer([(x[0], x[1]) for x in targets])
+        transfer.run(on_progress, on_progress)
+        job.errors += transfer.errors
+        job.errors += [f'"{x}" is cancelled.  Removed.'
+                       for x in transfer.cancelled]
+
+    def _move_job(self, job: Job, targets: typing.List[
+            typing.Tuple[Path, Path, bool]]) -> None:
+        job.files_total = len(targets)
+        for [src, dest, _] in targets:
+            if job.is_cancelled():
+                return
+            try:
+                # Note: shutil.move() moves into the existing directory.
+                # The overwritten destination must be removed first.
+                if dest.is_symlink() or dest.is_file():
+                    dest.unlink()
+                elif dest.is_dir():
+                    self.rmtree(dest)
+                shutil.move(str(src), str(dest))
+            except OSError as e:
+                job.errors.append(str(e))
+                continue
+            job.files_done += 1
+            job.notify()
+
+    def _paste_finished(self, view: View, defx: Defx,
+                        action: ClipboardAction, targets: typing.List[
+                            typing.Tuple[Path, Path, bool]],
+                        job: Job) -> None:
+        if action == ClipboardAction.MOVE:
+            # Check rename
+            for [src, dest, _] in targets:
+                if (dest.exists() and not dest.is_dir() and
+                        view._vim.call('bufexists', str(src))):
+                    view._vim.call('defx#util#buffer_rename',
+                                   view._vim.call('bufnr', str(src)),
+                                   str(dest))
+
+        if not view._vim.call('bufloaded', view._bufnr):
+            return
+
+        # Note: The user may leave defx buffer while pasting
+        self.paste_done(view, defx, action, targets,
+                        view._buffer == view._vim.current.buffer)
+        self._check_job(view, job)
+
+    def remove_paths(self, view: View, defx: Defx,
+                     paths: typing.List[Path]) -> None:
+        # Note: Move the targets to the staging directories first.  The
+        # tree is updated immediately and they are removed in the
+        # background.
+        staged = [self._stage(x) for x in paths]
+
+        def remove(job: Job) -> None:
+            job.files_total = len(staged)
+            for [path, staged_path] in zip(paths, staged):
+                try:
+                    if job.is_cancelled():
+                        if path != staged_path:
+                            # Restore the staged path
+                            staged_path.rename(path)
+                            staged_path.parent.rmdir()
+                        continue
+                    if (staged_path.is_dir() and
+                            not staged_path.is_symlink()):
+                        shutil.rmtree(str(staged_path))
+                    else:
+                        staged_path.unlink()
+                    if path != staged_path:
+                        staged_path.parent.rmdir()
+                except OSError as e:
+                    job.errors.append(str(e))
+                job.files_done += 1
+                job.notify()
+
+        view._vim.call('defx#util#buffer_delete_paths',
+                       [str(x) for x in paths])
+        self.update_tree(view, [(x, None) for x in paths])
+        self.start_job(view, Job('remove', self._job_description(paths),
+                                 remove, paths),
+                       lambda x: self._check_job(view, x))
+
+    def _check_job(self, view: View, job: Job) -> None:
+        # The trees are already updated.  Redraw the views if the job is
+        # incomplete.
+        if job.status == 'done':
+            return
+        call = view._vim.call
+        if call('bufloaded', view._bufnr):
+            view.redraw(True)
+        for other in [x for x in view._views
+                      if x != view and call('bufwinnr', x._bufnr) > 0]:
+            other.redraw(True)
+
+    def _stage(self, path: Path) -> Path:
+        try:
+            staging = Path(tempfile.mkdtemp(
+                prefix=STAGING_PREFIX, dir=str(path.parent)))
+        except OSError:
+            return path
+        staged = staging.joinpath(path.name)
+        try:
+            path.rename(staged)
+        except OSError:
+            staging.rmdir()
+            return path
+        return staged
+
+    def _job_description(self, paths: typing.List[typing.Any]) -> str:
+        return (str(paths[0]) if len(paths) == 1
+                else str(len(paths)) + ' files')
+
     def check_output(self, view: View, cwd: str,
                      args: typing.List[str]) -> None:
         output = subprocess.check_output(args, cwd=cwd)
@@ -112,16 +288,55 @@ class Kind(Base):
         for target in context.targets:
             view._vim.call('defx#util#open', str(target['action__path']))
 
+    @action(name='find', attr=ActionAttr.NO_TAGETS)
+    def _find(self, view: View, defx: Defx, context: Context) -> None:
+        """
+        Find the file by the filename index and reveal it.
+        """
+        index = file_index(Path(defx._cwd))
+        if not index.is_loaded:
+            index.load()
+
+        if not hasattr(view._vim, 'async_call'):
+            index.run()
+        else:
+            # Note: The index is updated in the background.  The current
+            # index is used for the query.
+            index.update(lambda x: view._vim.async_call(
+                view.print_msg, f'Updated the index of "{x.root}"'))
+
+        query = (context.args[0] if context.args else view._vim.call(
+            'defx#util#input', 'Find: ', '', ''))
+        if not query:
+            return
+
+        found = index.find(query)
+        if not found:
+            view.print_msg('Not found: the index is being updated'
+                           if index.is_running() else 'Not found')
+            return
+
+        if len(found) == 1:
+            choice = 1
+        else:
+            choice = view._vim.call('inputlist', ['Select the file:'] + [
+                f'{i + 1}. {x.relative_to(index.root)}'
+                for [i, x] in enumerate(found)])
+            view._vim.command('redraw')
+        if choice < 1 or choice > len(found):
+            return
+
+        # Note: Only the parents of the path are opened
+        view.search_recursive(found[choice - 1], defx._index)
+
     @action(name='preview')
     def _preview(self, view: View, defx: Defx, context: Context) -> None:
         candidate = view.get_cursor_candidate(context.cursor)
         if not candidate or candidate['action__path'].is_dir():
             return
 
-        filepath = str(candidate['action__path'])
-        guess_type = mimetypes.guess_type(filepath)[0]
-        if (guess_type and guess_type.startswith('image/') and
-                shutil.which('ueberzug') and shutil.which('bash')):
+        if (is_image(candidate['action__path']) and
+                shutil.which('ueberzug')):
             self._preview_image(view, defx, context, candidate)
             return
 
@@ -132,22 +347,19 @@ class Kind(Base):
         filepath = str(candidate['action__path'])
 
         if filepath == view._previewed_img:
+            image_preview().hide()
             view._previewed_img = ''
             return
 
-        preview_image_sh = Path(__file__).parent.parent.joinpath(
-            'preview_image.sh')
-
         wincol = context.wincol + view._vim.call('winwidth', 0)
         if wincol + context.preview_width > view._vim.options['columns']:
             wincol -= 2 * context.preview_width
-        args = ['bash', str(preview_image_sh), filepath,
-                wincol, 1, context.preview_width]
 
-        self.execute_job(view, args)
+        # Note: The preview process is reused for the next images
+        image_preview().show(filepath, wincol, 1, context.preview_width)
         view._previewed_img = filepath
 
-    @action(name='remove_trash', attr=ActionAttr.REDRAW)
+    @action(name='remove_trash')
     def _remove_trash(self, view: View, defx: Defx, context: Context) -> None:
         """
         Delete the file or directory.
@@ -169,10 +381,22 @@ class Kind(Base):
                 return
 
         import send2trash
-        for target in context.targets:
-            target_path = str(target['action__path'])
-            send2trash.send2trash(target_path)
+        paths = [str(x['action__path']) for x in context.targets]
+
+        def remove_trash(job: Job) -> None:
+            job.files_total = len(paths)
+            for path in paths:
+                if job.is_cancelled():
+                    return
+                try:
+                    send2trash.send2trash(path)
+                except OSError as e:
+                    job.errors.append(str(e))
+                job.files_done += 1
+                job.notify()
 
-            if view._vim.call('bufexists', target_path):
-                view._vim.call('defx#util#buffer_delete',
-                               view._vim.call('bufnr', target_path))
+        view._vim.call('defx#util#buffer_delete_paths', paths)
+        self.update_tree(view, [(Path(x), None) for x in paths])
+        self.start_job(view, Job('trash', self._job_description(paths),
+                                 remove_trash, [Path(x) for x in paths]),
+                       lambda x: self._check_job(view, x))
@@ -19,6 +19,7 @@ from defx.base.kind import Base, action
 from defx.clipboard import ClipboardAction
 from defx.context import Context
 from defx.defx import Defx
+from defx.job import Job
 from defx.util import cwd_input, confirm, error, Candidate
 from defx.util import fnamemodify
 from defx.view import View
@@ -65,10 +66,42 @@ class Kind(Base):
               cwd: str) -> None:
         pass
 
+    def paste_targets(self, view: View, defx: Defx, targets: typing.List[
+            typing.Tuple[PathLike, PathLike, bool]], cwd: str) -> None:
+        """
+        Paste the (src, dest, dest_exists) targets and update the tree.
+        """
+        action = view._clipboard.action
+        for index, [path, dest, _] in enumerate(targets):
+            view.print_msg(f'[{index + 1}/{len(targets)}] {path}')
+            self.paste(view, path, dest, cwd)
+            view._vim.command('redraw')
+
+        self.paste_done(view, defx, action, targets)
+
+    def paste_done(self, view: View, defx: Defx, action: ClipboardAction,
+                   targets: typing.List[
+                       typing.Tuple[PathLike, PathLike, bool]],
+                   search: bool = True) -> None:
+        if action == ClipboardAction.MOVE:
+            # Clear clipboard after action
+            view._clipboard.action = ClipboardAction.NONE
+            view._clipboard.candidates = []
+
+        view._vim.command('echo')
+
+        changes: typing.List[typing.Tuple[
+            typing.Optional[PathLike], typing.Optional[PathLike]]] = []
+        for [path, dest, exists] in targets:
+            if action == ClipboardAction.MOVE:
+                changes.append((path, None))
+            changes.append((dest if exists else None, dest))
+        self.update_tree(view, changes)
+        if targets and search:
+            view.search_recursive(targets[-1][1], defx._index)
+
     def preview_file(self, view: View, defx: Defx,
                      context: Context, candidate: Candidate) -> None:
-        filepath = str(candidate['action__path'])
-
         has_preview = bool(view._vim.call('defx#util#_get_preview_window'))
         if (has_preview and view._previewed_target and
                 view._previewed_target == candidate):
@@ -77,9 +110,19 @@ class Kind(Base):
 
         prev_id = view._vim.call('win_getid')
 
+        view._previewed_target = candidate
+        self.open_preview(view, context, candidate)
+
+        view._vim.call('win_gotoid', prev_id)
+
+    def open_preview(self, view: View, context: Context,
+                     candidate: Candidate) -> None:
+        """
+        Open the preview window of {candidate}.
+        """
+        filepath = str(candidate['action__path'])
         listed = view._vim.call('buflisted', filepath)
 
-        view._previewed_target = candidate
         view._vim.call('defx#util#preview_file',
                        context._replace(targets=[])._asdict(),
                        self.get_buffer_name(filepath))
@@ -91,8 +134,6 @@ class Kind(Base):
             previewed_buffers[bufnr] = 1
             view._vim.vars['defx#_previewed_buffers'] = previewed_buffers
 
-        view._vim.call('win_gotoid', prev_id)
-
     def input(self, view: View, defx: Defx, cwd: str, prompt: str, text: str,
               completion: str) -> str:
         if defx._source.name == 'file':
@@ -169,24 +210,81 @@ class Kind(Base):
             # Open vertical
             view._vim.command('noautocmd rightbelow vnew')
 
+    def update_tree(self, view: View, changes: typing.List[typing.Tuple[
+            typing.Optional[PathLike], typing.Optional[PathLike]]]) -> None:
+        """
+        Patch the trees by (old, new) changes instead of re-listing.
+        The other visible views are patched too.  The changes out of
+        their trees are ignored.
+        """
+        view.update_tree(changes)
+        call = view._vim.call
+        for other in [x for x in view._views
+                      if x != view and call('bufwinnr', x._bufnr) > 0]:
+            other.update_tree(changes)
+
+    def remove_paths(self, view: View, defx: Defx,
+                     paths: typing.List[PathLike]) -> None:
+        """
+        Remove {paths} and update the tree.
+        """
+        for path in paths:
+            if path.is_dir() and not path.is_symlink():
+                self.rmtree(path)
+            else:
+                path.unlink()
+
+        view._vim.call('defx#util#buffer_delete_paths',
+                       [str(x) for x in paths])
+        self.update_tree(view, [(x, None) for x in paths])
+
+    def start_job(self, view: View, job: Job, on_done: typing.Optional[
+            typing.Callable[[Job], None]] = None) -> None:
+        """
+        Queue {job} to the job scheduler.  {on_done} is called in the
+        main thread.  If Vim cannot accept the callback from other
+        threads, {job} is executed synchronously.
+        """
+        if not hasattr(view._vim, 'async_call'):
+            job.run()
+            self._job_done(view, job, on_done)
+            return
+
+        job.set_progress(lambda x: view._vim.async_call(
+            view.print_msg, str(x)))
+        view._jobs.start(job, lambda x: view._vim.async_call(
+            self._job_done, view, x, on_done))
+
+    def _job_done(self, view: View, job: Job, on_done: typing.Optional[
+            typing.Callable[[Job], None]] = None) -> None:
+        for err in job.errors:
+            error(view._vim, err)
+        if on_done:
+            on_done(job)
+        view.print_msg(str(job))
+
     def create_open(self, view: View, defx: Defx, context: Context,
                     path: Path, command: str,
                     isdir: bool, isopen: bool) -> None:
+        # The top directory created by mkdir
+        created = path
+        while created.parent != created and not created.parent.exists():
+            created = created.parent
+
         if isdir:
             path.mkdir(parents=True)
         else:
             path.parent.mkdir(parents=True, exist_ok=True)
             path.touch()
 
-        if not isopen:
-            view.redraw(True)
-            view.search_recursive(path, defx._index)
-            return
-
         # Note: Must be redraw before actions
-        view.redraw(True)
+        if not view.insert_candidate(created, defx._index):
+            view.redraw(True)
         view.search_recursive(path, defx._index)
 
+        if not isopen:
+            return
+
         if isdir:
             if command == 'open_tree':
                 view.open_tree(path, defx._index, False, 0)
@@ -242,12 +340,7 @@ class Kind(Base):
 
     @action(name='check_redraw', attr=ActionAttr.NO_TAGETS)
     def _check_redraw(self, view: View, defx: Defx, context: Context) -> None:
-        root = defx.get_root_candidate()['action__path']
-        if not root.exists():
-            return
-        mtime = root.stat().st_mtime
-        if mtime != defx._mtime:
-            view.redraw(True)
+        view.refresh_changed_directories()
 
     @action(name='copy')
     def _copy(self, view: View, defx: Defx, context: Context) -> None:
@@ -557,8 +650,8 @@ class Kind(Base):
         else:
             cwd = str(Path(candidate['action__path']).parent)
 
-        dest = None
-        for index, candidate in enumerate(view._clipboard.candidates):
+        targets: typing.List[typing.Tuple[PathLike, PathLike, bool]] = []
+        for candidate in view._clipboard.candidates:
             path = candidate['action__path']
             dest = self.path_maker(cwd).joinpath(path.name)
             if dest.exists():
@@ -570,29 +663,17 @@ class Kind(Base):
             if not path.exists() or path == dest:
                 continue
 
-            view.print_msg(
-                f'[{index + 1}/{len(view._clipboard.candidates)}] {path}')
-
-            if dest.exists() and action != ClipboardAction.MOVE:
+            exists = dest.exists()
+            if exists and action != ClipboardAction.MOVE:
                 # Must remove dest before
                 if not dest.is_symlink() and dest.is_dir():
                     self.rmtree(dest)
                 else:
                     dest.unlink()
 
-            self.paste(view, path, dest, cwd)
-            view._vim.command('redraw')
-
-        if action == ClipboardAction.MOVE:
-            # Clear clipboard after action
-            view._clipboard.action = ClipboardAction.NONE
-            view._clipboard.candidates = []
-
-        view._vim.command('echo')
+            targets.append((path, dest, exists))
 
-        view.redraw(True)
-        if dest:
-            view.search_recursive(dest, defx._index)
+        self.paste_targets(view, defx, targets, cwd)
 
     @action(name='preview')
     def _preview(self, view: View, defx: Defx, context: Context) -> None:
@@ -602,7 +683,7 @@ class Kind(Base):
 
         self.preview_file(view, defx, context, candidate)
 
-    @action(name='remove', attr=ActionAttr.REDRAW)
+    @action(name='remove')
     def _remove(self, view: View, defx: Defx, context: Context) -> None:
         """
         Delete the file or directory.
@@ -619,16 +700,8 @@ class Kind(Base):
             if not confirm(view._vim, message):
                 return
 
-        for target in context.targets:
-            path = target['action__path']
-
-            if path.is_dir():
-                self.rmtree(path)
-            else:
-                path.unlink()
-
-            view._vim.call('defx#util#buffer_delete',
-                           view._vim.call('bufnr', str(path)))
+        self.remove_paths(view, defx,
+                          [x['action__path'] for x in context.targets])
 
     @action(name='rename')
     def _rename(self, view: View, defx: Defx, context: Context) -> None:
@@ -677,5 +750,5 @@ class Kind(Base):
                 view._vim.call('defx#util#buffer_rename',
                                view._vim.call('bufnr', str(old)), str(new))
 
-            view.redraw(True)
+            self.update_tree(view, [(old, new)])
             view.search_recursive(new, defx._index)
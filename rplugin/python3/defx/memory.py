@@ -0,0 +1,88 @@
+# ============================================================================
+# FILE: memory.py
+# AUTHOR: Shougo Matsushita <Shougo.Matsu at gmail.com>
+# License: MIT license
+# ============================================================================
+
+import sys
+import tracemalloc
+import typing
+
+from defx.transfer import format_size
+
+_baseline: typing.Optional[tracemalloc.Snapshot] = None
+
+
+def deep_size(obj: typing.Any,
+              seen: typing.Optional[typing.Set[int]] = None) -> int:
+    """
+    Returns the approximate bytes of {obj} and the contained objects.
+    Only the containers are followed.  The shared objects are counted
+    once in {seen}.
+    """
+    if seen is None:
+        seen = set()
+    size = 0
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        if id(o) in seen:
+            continue
+        seen.add(id(o))
+        size += sys.getsizeof(o)
+        if isinstance(o, dict):
+            stack += o.keys()
+            stack += o.values()
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            stack += o
+    return size
+
+
+def sizes(items: typing.List[typing.Tuple[str, typing.Any]]
+          ) -> typing.List[str]:
+    """
+    Returns the formatted sizes of the named objects.
+    """
+    seen: typing.Set[int] = set()
+    lines = []
+    for [name, obj] in items:
+        length = f'({len(obj)})' if hasattr(obj, '__len__') else ''
+        lines.append('{:<40} {:>10} {}'.format(
+            name, format_size(deep_size(obj, seen)), length))
+    return lines
+
+
+def is_tracing() -> bool:
+    return tracemalloc.is_tracing()
+
+
+def start() -> None:
+    """
+    Start tracemalloc and take the baseline snapshot.
+    """
+    global _baseline
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _baseline = tracemalloc.take_snapshot()
+
+
+def stop() -> None:
+    global _baseline
+    _baseline = None
+    tracemalloc.stop()
+
+
+def diff(limit: int = 10) -> typing.List[str]:
+    """
+    Returns the top {limit} allocation differences from the baseline.
+    """
+    if not _baseline or not tracemalloc.is_tracing():
+        return []
+    snapshot = tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+    ])
+    stats = snapshot.compare_to(_baseline, 'lineno')
+    [current, peak] = tracemalloc.get_traced_memory()
+    return [
+        f'current: {format_size(current)} peak: {format_size(peak)}'
+    ] + [str(x) for x in stats[: limit]]
@@ -0,0 +1,166 @@
+# ============================================================================
+# FILE: plugins.py
+# AUTHOR: Shougo Matsushita <Shougo.Matsu at gmail.com>
+# License: MIT license
+# ============================================================================
+
+from pathlib import Path
+from pynvim import Nvim
+import json
+import os
+import typing
+
+from defx.util import import_plugin
+
+# The plugin files in the runtimepath
+PATTERNS = {
+    'column': ['rplugin/python3/defx/column/*.py'],
+    'source': ['rplugin/python3/defx/source/*.py',
+               'rplugin/python3/defx/source/*/*.py'],
+}
+
+
+def _mtime(path: str) -> float:
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return -1
+
+
+def guess_name(path: Path, kind: str) -> str:
+    """
+    Returns the plugin name guessed by {path}.
+    "source/file/__init__.py" is "file" and "source/file/list.py" is
+    "file/list".
+    """
+    parts = list(path.with_suffix('').parts)
+    if kind in parts:
+        parts = parts[len(parts) - parts[::-1].index(kind):]
+    if parts[-1:] == ['__init__']:
+        parts = parts[: -1]
+    return '/'.join(parts)
+
+
+class Plugins(object):
+    """
+    The source and column plugins in the runtimepath.
+
+    The globbed files are cached by the runtimepath and the mtimes of
+    the plugin directories.  The plugin names are saved in {cache_file}
+    with the file mtimes.  Only the used plugins are imported.
+    """
+
+    def __init__(self, cache_file: Path) -> None:
+        self._cache_file = cache_file
+        self._files: typing.Dict[str, typing.Tuple[
+            str, typing.Dict[str, float], typing.List[Path]]] = {}
+        self._classes: typing.Dict[str, typing.Tuple[float, typing.Any]] = {}
+        # [mtime, name]
+        self._names: typing.Dict[str, typing.List[typing.Any]] = {}
+        self._loaded = False
+
+    def files(self, vim: Nvim, kind: str) -> typing.List[Path]:
+        runtimepath = vim.options['runtimepath']
+        cached = self._files.get(kind, None)
+        if cached and cached[0] == runtimepath and not [
+                x for [x, y] in cached[1].items() if _mtime(x) != y]:
+            return cached[2]
+
+        paths: typing.List[Path] = []
+        for pattern in PATTERNS[kind]:
+            paths += [Path(x) for x in vim.call(
+                'globpath', runtimepath, pattern, 1, 1)]
+
+        # Note: The new files change the mtime of the directory
+        dirs: typing.Dict[str, float] = {}
+        for path in paths:
+            dirs[str(path.parent)] = _mtime(str(path.parent))
+            if path.parent.parent.name == kind:
+                dirs[str(path.parent.parent)] = _mtime(
+                    str(path.parent.parent))
+        self._files[kind] = (runtimepath, dirs, paths)
+        return paths
+
+    def find(self, vim: Nvim, kind: str, name: str) -> typing.Any:
+        """
+        Returns the new plugin instance of {name} or None.  The plugin
+        is searched by the cached and guessed names first.
+        """
+        if not self._loaded:
+            self._load()
+
+        paths = self.files(vim, kind)
+        tried: typing.Set[Path] = set()
+        for path in paths:
+            if self._name(path, kind) != name:
+                continue
+            tried.add(path)
+            plugin = self._new(vim, path, kind)
+            if plugin and plugin.name == name:
+                return plugin
+
+        # The name is not known.  Import the other plugins.
+        for path in [x for x in paths if x not in tried]:
+            entry = self._names.get(str(path), None)
+            if entry and entry[0] == _mtime(str(path)):
+                continue
+            plugin = self._new(vim, path, kind)
+            if plugin and plugin.name == name:
+                return plugin
+        return None
+
+    def _name(self, path: Path, kind: str) -> str:
+        entry = self._names.get(str(path), None)
+        if entry and entry[0] == _mtime(str(path)):
+            return str(entry[1])
+        return guess_name(path, kind)
+
+    def _new(self, vim: Nvim, path: Path, kind: str) -> typing.Any:
+        key = str(path)
+        mtime = _mtime(key)
+        cached = self._classes.get(key, None)
+        if cached and cached[0] == mtime:
+            cls = cached[1]
+        else:
+            cls = import_plugin(path, kind, kind.capitalize())
+            self._classes[key] = (mtime, cls)
+        if not cls:
+            return None
+
+        plugin = cls(vim)
+        if self._names.get(key, None) != [mtime, plugin.name]:
+            self._names[key] = [mtime, plugin.name]
+            self._save()
+        return plugin
+
+    def _load(self) -> None:
+        self._loaded = True
+        try:
+            self._names = json.loads(self._cache_file.read_text())
+        except (OSError, ValueError):
+            self._names = {}
+
+    def _save(self) -> None:
+        # Note: Write to the temporary file and rename it for atomicity
+        tmp = self._cache_file.with_name(self._cache_file.name + '.tmp')
+        try:
+            self._cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(self._names))
+            tmp.replace(self._cache_file)
+        except OSError:
+            pass
+
+
+_plugins: typing.Optional[Plugins] = None
+
+
+def plugins() -> Plugins:
+    """
+    Returns the plugins shared by defx buffers.
+    """
+    global _plugins
+    if not _plugins:
+        cache_home = os.environ.get(
+            'XDG_CACHE_HOME', str(Path.home().joinpath('.cache')))
+        _plugins = Plugins(Path(cache_home).joinpath('defx', 'plugins.json'))
+    return _plugins
@@ -0,0 +1,223 @@
+# ============================================================================
+# FILE: preview.py
+# AUTHOR: Shougo Matsushita <Shougo.Matsu at gmail.com>
+# License: MIT license
+# ============================================================================
+
+from collections import OrderedDict
+from pathlib import Path
+import hashlib
+import json
+import mmap
+import os
+import subprocess
+import threading
+import typing
+
+from defx.transfer import format_size
+
+# The size to check the binary file like git
+SNIFF_SIZE = 8000
+
+# The bounding box of the image thumbnails
+THUMBNAIL_SIZE = (1024, 1024)
+
+PreviewKey = typing.Tuple[str, float, int, int]
+
+
+def read_head(path: Path, size: int) -> bytes:
+    """
+    Read the first {size} bytes of {path}.  The file is mapped instead
+    of reading the whole file.
+    """
+    with path.open('rb') as f:
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                return m[: size]
+        except (ValueError, OSError):
+            # Empty or special files cannot be mapped
+            return f.read(size)
+
+
+def is_binary(data: bytes) -> bool:
+    return b'\0' in data[: SNIFF_SIZE]
+
+
+class Preview(object):
+    """
+    The LRU cache of the previewed lines.  The key is (path, mtime,
+    size, head size) so the modified file is read again.
+    """
+
+    def __init__(self, max_entries: int = 32) -> None:
+        self._cache: typing.OrderedDict[
+            PreviewKey, typing.Tuple[typing.List[str], bool]] = OrderedDict()
+        self._max_entries = max_entries
+
+    def get(self, path: Path, head_size: int
+            ) -> typing.Tuple[typing.List[str], bool]:
+        """
+        Returns (lines, is_binary) of the first {head_size} bytes.
+        """
+        stat = path.stat()
+        key = (str(path), stat.st_mtime, stat.st_size, head_size)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        data = read_head(path, head_size)
+        binary = is_binary(data)
+        if binary:
+            lines = [f'Binary file: {path} ({format_size(stat.st_size)})']
+        else:
+            lines = data.decode('utf-8', 'replace').splitlines()
+            if stat.st_size > head_size:
+                # Drop the partial last line
+                lines = lines[: -1] if len(lines) > 1 else lines
+                lines.append('[Truncated: {} of {}]'.format(
+                    format_size(head_size), format_size(stat.st_size)))
+
+        self._cache[key] = (lines, binary)
+        if len(self._cache) > self._max_entries:
+            self._cache.popitem(last=False)
+        return (lines, binary)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+class ImagePreview(object):
+    """
+    The image preview by "ueberzug layer" process.
+
+    The process is started once and receives the JSON commands by the
+    pipe.  The thumbnails are created by the worker thread and only the
+    latest request is shown.
+    """
+
+    def __init__(self, cache_dir: Path, max_thumbnails: int = 256) -> None:
+        self._cache_dir = cache_dir
+        self._max_thumbnails = max_thumbnails
+        self._process: typing.Optional[subprocess.Popen[str]] = None
+        self._request: typing.Optional[typing.Dict[str, typing.Any]] = None
+        self._generation = 0
+        self._cond = threading.Condition()
+        self._thread: typing.Optional[threading.Thread] = None
+
+    def show(self, path: str, x: int, y: int, width: int) -> None:
+        with self._cond:
+            self._generation += 1
+            self._request = {
+                'action': 'add', 'identifier': 'defx_preview',
+                'path': path, 'x': x, 'y': y, 'width': width,
+            }
+            self._cond.notify()
+
+        if not self._thread:
+            self._thread = threading.Thread(target=self._work, daemon=True)
+            self._thread.start()
+
+    def hide(self) -> None:
+        with self._cond:
+            # Drop the pending request
+            self._generation += 1
+            self._request = None
+            if self._process:
+                self._send(
+                    {'action': 'remove', 'identifier': 'defx_preview'})
+
+    def stop(self) -> None:
+        if self._process and self._process.poll() is None:
+            self._process.terminate()
+        self._process = None
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                while not self._request:
+                    self._cond.wait()
+                request = self._request
+                generation = self._generation
+                self._request = None
+
+            request['path'] = str(self.thumbnail(Path(request['path'])))
+            with self._cond:
+                # Skip it if the cursor is moved while decoding
+                if generation == self._generation:
+                    self._send(request)
+
+    def _send(self, command: typing.Dict[str, typing.Any]) -> None:
+        try:
+            if not self._process or self._process.poll() is not None:
+                self._process = subprocess.Popen(
+                    ['ueberzug', 'layer', '--parser', 'json', '--silent'],
+                    stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL, universal_newlines=True)
+            if not self._process.stdin:
+                return
+            self._process.stdin.write(json.dumps(command) + '\n')
+            self._process.stdin.flush()
+        except OSError:
+            self.stop()
+
+    def thumbnail(self, path: Path) -> Path:
+        """
+        Returns the cached thumbnail path of {path}.  If Pillow is not
+        installed, {path} is returned.
+        """
+        try:
+            from PIL import Image
+            stat = path.stat()
+        except (ImportError, OSError):
+            return path
+
+        key = f'{path}:{stat.st_mtime}:{stat.st_size}'
+        thumbnail = self._cache_dir.joinpath(
+            hashlib.sha1(key.encode('utf-8')).hexdigest() + '.png')
+        if thumbnail.exists():
+            return thumbnail
+
+        try:
+            self._cache_dir.mkdir(parents=True, exist_ok=True)
+            with Image.open(str(path)) as image:
+                if (image.width <= THUMBNAIL_SIZE[0] and
+                        image.height <= THUMBNAIL_SIZE[1]):
+                    return path
+                image.thumbnail(THUMBNAIL_SIZE)
+                image.save(str(thumbnail))
+        except Exception:
+            return path
+
+        self._prune()
+        return thumbnail
+
+    def _prune(self) -> None:
+        thumbnails = sorted(self._cache_dir.glob('*.png'),
+                            key=lambda x: x.stat().st_mtime)
+        for old in thumbnails[: max(
+                0, len(thumbnails) - self._max_thumbnails)]:
+            try:
+                old.unlink()
+            except OSError:
+                pass
+
+
+_image_preview: typing.Optional[ImagePreview] = None
+
+
+def image_preview() -> ImagePreview:
+    """
+    Returns the image preview shared by defx buffers.
+    """
+    global _image_preview
+    if not _image_preview:
+        cache_home = os.environ.get(
+            'XDG_CACHE_HOME', str(Path.home().joinpath('.cache')))
+        _image_preview = ImagePreview(
+            Path(cache_home).joinpath('defx', 'thumbnails'))
+    return _image_preview
+
+
+def hide_image_preview() -> None:
+    if _image_preview:
+        _image_preview.hide()
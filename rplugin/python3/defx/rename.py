@@ -0,0 +1,131 @@
+# ============================================================================
+# FILE: rename.py
+# AUTHOR: Shougo Matsushita <Shougo.Matsu at gmail.com>
+# License: MIT license
+# ============================================================================
+
+import os
+import typing
+from pathlib import Path
+
+Rename = typing.Tuple[Path, Path]
+
+
+def _exists(path: Path) -> bool:
+    return path.exists() or path.is_symlink()
+
+
+def _is_case_rename(old: Path, new: Path) -> bool:
+    return str(old).lower() == str(new).lower()
+
+
+def _temp_path(path: Path, targets: typing.Set[Path]) -> Path:
+    """
+    Returns the unused temporary name in the same directory.
+    """
+    i = 0
+    while True:
+        temp = path.with_name(f'.{path.name}.defx-{i}')
+        if temp not in targets and not _exists(temp):
+            return temp
+        i += 1
+
+
+def validate(renames: typing.List[Rename]
+             ) -> typing.Tuple[typing.List[Rename], typing.List[str]]:
+    """
+    Returns the valid renames and the errors.
+    The target may be the source of the other rename.
+    """
+    errors = []
+    moves: typing.Dict[Path, Path] = {}
+    targets: typing.Set[Path] = set()
+    for [old, new] in renames:
+        if old == new:
+            continue
+        if not _exists(old):
+            errors.append(f'{old} does not exist. Skip.')
+        elif old in moves or new in targets:
+            errors.append(f'{new} is duplicated. Skip.')
+        else:
+            moves[old] = new
+            targets.add(new)
+
+    # Note: The skipped rename may block the other renames.
+    while True:
+        blocked = [x for x in moves
+                   if moves[x] not in moves and _exists(moves[x])
+                   and not _is_case_rename(x, moves[x])]
+        if not blocked:
+            break
+        for old in blocked:
+            errors.append(f'{moves.pop(old)} is already exists. Skip.')
+    return (list(moves.items()), errors)
+
+
+def plan(renames: typing.List[Rename]) -> typing.List[Rename]:
+    """
+    Returns the rename steps of the valid {renames}.
+    The chained renames are ordered from the tail and the cycles are
+    broken by the temporary names.
+    """
+    # Note: The children must be renamed before the parents.
+    pending = dict(sorted(renames, key=lambda x: -len(x[0].parts)))
+    targets = set(pending.values())
+    steps: typing.List[Rename] = []
+    for start in list(pending.keys()):
+        if start not in pending:
+            continue
+
+        # Note: The target is unique.  The chain is the path or the cycle.
+        chain = [start]
+        current = pending[start]
+        while current in pending and current != start:
+            chain.append(current)
+            current = pending[current]
+
+        if current != start:
+            steps += [(x, pending.pop(x)) for x in reversed(chain)]
+            continue
+
+        temp = _temp_path(start, targets)
+        steps.append((start, temp))
+        steps += [(x, pending.pop(x)) for x in reversed(chain[1:])]
+        steps.append((temp, pending.pop(start)))
+    return steps
+
+
+def execute(renames: typing.List[Rename]
+            ) -> typing.Tuple[typing.List[Rename], typing.List[str]]:
+    """
+    Rename the files by {renames}.
+    Returns the done renames and the errors.
+    """
+    [moves, errors] = validate(renames)
+    targets = set([x[1] for x in moves])
+    temps: typing.Dict[Path, Path] = {}
+    done = []
+    for [old, new] in plan(moves):
+        # Note: os.rename() overwrites the target if the previous step
+        # failed.
+        if _exists(new) and not _is_case_rename(old, new):
+            errors.append(f'{new} is already exists. Skip.')
+            continue
+        try:
+            if not new.parent.exists():
+                new.parent.mkdir(parents=True)
+            os.rename(old, new)
+        except OSError as e:
+            errors.append(f'{new} is rename error: {e}')
+            continue
+
+        if old in temps:
+            done.append((temps.pop(old), new))
+        elif new not in targets:
+            temps[new] = old
+        else:
+            done.append((old, new))
+
+    for [temp, old] in temps.items():
+        errors.append(f'{old} is left as {temp}')
+    return (done, errors)
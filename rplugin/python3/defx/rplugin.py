@@ -4,10 +4,16 @@
 # License: MIT license
 # ============================================================================
 
+from pathlib import Path
 from pynvim import Nvim
 import typing
 
 from defx.clipboard import Clipboard
+from defx.executor import ActionExecutor
+from defx.job import Jobs
+from defx.rename import execute
+from defx.stats import rpc_stats
+from defx.util import error
 from defx.view import View
 
 Candidate = typing.Dict[str, typing.Union[str, bool]]
@@ -28,15 +34,25 @@ class Rplugin:
 
     def __init__(self, vim: Nvim) -> None:
         self._vim = vim
+        rpc_stats().hook(vim)
         self._views: typing.List[View] = []
+        # Note: The index is used in the buffer name
+        self._view_index = 0
         self._clipboard = Clipboard()
+        self._jobs = Jobs()
+        self._executor = ActionExecutor(vim, self._do_action)
 
     def init_channel(self) -> None:
         self._vim.vars['defx#_channel_id'] = self._vim.channel_id
 
     def start(self, args: typing.List[typing.Any]) -> None:
         [paths, context] = args
-        self.get_view(context).init_paths(paths, context, self._clipboard)
+        with rpc_stats().scope('start'):
+            view = self.get_view(context)
+            # Note: The pending requests of the previous paths are
+            # cancelled.
+            self._executor.cancel(view)
+            view.init_paths(paths, context, self._clipboard, self._jobs)
 
     def _current_views(self) -> typing.List[View]:
         return [x for x in self._views
@@ -46,15 +62,33 @@ class Rplugin:
         views = self._current_views()
         if not views:
             return
-        view = views[0]
+
+        # Note: The pending async actions are done first
+        self._executor.flush(views[0])
+        self._do_action(views[0], args)
+
+    def async_action(self, args: typing.List[typing.Any]) -> None:
+        views = self._current_views()
+        if not views:
+            return
+        self._executor.submit(views[0], args)
+
+    def _do_action(self, view: View, args: typing.List[typing.Any]) -> None:
+        if view._bufnr != self._vim.current.buffer.number:
+            # The window is changed before the async action
+            return
 
         prev_paths = [x._cwd for x in view._defxs]
-        prev_candidates = view._candidates
+        # Note: The narrowed candidates are not changed in the other views
+        prev_candidates = view.get_tree_candidates()
 
         view.do_action(args[0], args[1], args[2])
+        if args[0] == 'quit':
+            self._executor.cancel(view)
 
         paths = [x._cwd for x in view._defxs]
-        if paths == prev_paths and view._candidates != prev_candidates:
+        if (paths == prev_paths and
+                view.get_tree_candidates() != prev_candidates):
             self.redraw([x for x in self._views if x != view])
 
     def get_candidate(self) -> Candidate:
@@ -81,15 +115,65 @@ class Rplugin:
         return {}
 
     def get_view(self, context: typing.Dict[str, typing.Any]) -> View:
+        self.trim_views()
         views = [x for x in self._views
                  if context['buffer_name'] == x._context.buffer_name]
         if not views or context['new']:
-            view = View(self._vim, len(self._views))
+            view = View(self._vim, self._view_index)
+            view._views = self._views
+            self._view_index += 1
             views = [view]
             self._views.append(view)
         return views[0]
 
+    def trim_views(self) -> None:
+        """
+        Remove the views of the wiped out buffers.
+        """
+        call = self._vim.call
+        views = [x for x in self._views
+                 if x._bufnr < 0 or call('bufexists', x._bufnr)]
+        for view in [x for x in self._views if x not in views]:
+            self._executor.cancel(view)
+        # Note: The list is shared by the views
+        self._views[:] = views
+
     def redraw(self, views: typing.List[View]) -> None:
         call = self._vim.call
         for view in [x for x in views if call('bufwinnr', x._bufnr) > 0]:
             view.redraw(True)
+
+    def bulk_rename(self, args: typing.List[typing.Any]) -> typing.List[int]:
+        """
+        Rename the files by [old, new] pairs and update the trees once.
+        Returns the indexes of the done renames.
+        """
+        [renames] = args
+        paths = [(Path(x[0]), Path(x[1])) for x in renames]
+        [done, errors] = execute(paths)
+        if errors:
+            error(self._vim, '\n'.join(errors))
+        if not done:
+            return []
+
+        self._vim.call('defx#util#buffer_rename_all',
+                       [[str(x[0]), str(x[1])] for x in done
+                        if not x[1].is_dir()])
+
+        # Note: The swapped candidates must be removed before the inserts.
+        olds = set([x[0] for x in done])
+        news = set([x[1] for x in done])
+        swapped = [x for x in done if x[0] in news or x[1] in olds]
+        changes: typing.List[typing.Tuple[
+            typing.Optional[Path], typing.Optional[Path]]] = [
+                (x[0], x[1]) for x in done
+                if x[0] not in news and x[1] not in olds]
+        changes += [(x[0], None) for x in swapped]
+        changes += [(None, x[1]) for x in swapped]
+
+        call = self._vim.call
+        for view in [x for x in self._views
+                     if call('bufwinnr', x._bufnr) > 0]:
+            view.update_tree(changes)
+        indexes = {x: i for [i, x] in enumerate(paths)}
+        return [indexes[x] for x in done]
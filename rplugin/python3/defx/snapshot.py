@@ -0,0 +1,116 @@
+# ============================================================================
+# FILE: snapshot.py
+# AUTHOR: Shougo Matsushita <Shougo.Matsu at gmail.com>
+# License: MIT license
+# ============================================================================
+
+from pathlib import Path
+import marshal
+import os
+import threading
+import typing
+
+SNAPSHOT_VERSION = 1
+
+# The directories in the snapshot file
+MAX_DIRECTORIES = 10000
+
+# The (name, is_directory) entries of the directory
+Entries = typing.List[typing.Tuple[str, bool]]
+
+
+class Snapshot(object):
+    """
+    The directory listings saved in {path} by marshal.
+
+    The listings are used only while painting the tree at startup.
+    The used directories are validated by (inode, mtime) later.
+    """
+
+    def __init__(self, path: Path, save_delay: float = 2.0) -> None:
+        self.is_painting = False
+        self._path = path
+        self._save_delay = save_delay
+        self._dirs: typing.Dict[
+            str, typing.Tuple[int, float, Entries]] = {}
+        self._served: typing.Set[str] = set()
+        self._lock = threading.Lock()
+        self._timer: typing.Optional[threading.Timer] = None
+        self._load()
+
+    def get(self, path: str) -> typing.Optional[Entries]:
+        if not self.is_painting:
+            return None
+        with self._lock:
+            entry = self._dirs.get(path, None)
+            if not entry:
+                return None
+            self._served.add(path)
+        return entry[2]
+
+    def put(self, path: str, st: os.stat_result, entries: Entries) -> None:
+        with self._lock:
+            # Note: Move it to the end.  The old directories are dropped.
+            self._dirs.pop(path, None)
+            self._dirs[path] = (st.st_ino, st.st_mtime, entries)
+            if self._timer:
+                return
+            self._timer = threading.Timer(self._save_delay, self.save)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def changed(self) -> typing.List[str]:
+        """
+        Returns the changed directories of the used listings.
+        """
+        with self._lock:
+            served = [(x, self._dirs[x]) for x in self._served
+                      if x in self._dirs]
+            self._served = set()
+
+        changed: typing.List[str] = []
+        for [path, entry] in served:
+            try:
+                st = os.stat(path)
+            except OSError:
+                changed.append(path)
+                continue
+            if st.st_ino != entry[0] or st.st_mtime != entry[1]:
+                changed.append(path)
+        return changed
+
+    def save(self) -> None:
+        with self._lock:
+            self._timer = None
+            dirs = list(self._dirs.items())[-MAX_DIRECTORIES:]
+            data = marshal.dumps((SNAPSHOT_VERSION, dict(dirs)))
+
+        # Note: Write to the temporary file and rename it for atomicity
+        tmp = self._path.with_name(self._path.name + '.tmp')
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_bytes(data)
+            tmp.replace(self._path)
+        except OSError:
+            pass
+
+    def _load(self) -> None:
+        try:
+            [version, dirs] = marshal.loads(self._path.read_bytes())
+        except (OSError, ValueError, EOFError, TypeError):
+            return
+        if version == SNAPSHOT_VERSION and isinstance(dirs, dict):
+            self._dirs = dirs
+
+
+_snapshots: typing.Dict[str, Snapshot] = {}
+
+
+def snapshot(path: str) -> Snapshot:
+    """
+    Returns the snapshot of {path} shared by defx buffers.
+    """
+    path = os.path.expanduser(path)
+    if path not in _snapshots:
+        _snapshots[path] = Snapshot(Path(path))
+    return _snapshots[path]
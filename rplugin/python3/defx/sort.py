@@ -8,7 +8,8 @@ import functools
 import re
 import typing
 
-from defx.util import readable
+from defx.dirsize import cached_size
+from defx.util import readable, stat
 
 
 @functools.total_ordering
@@ -80,15 +81,21 @@ def _filename(
 def _size(
         candidate: typing.Dict[str, typing.Any]
 ) -> typing.Any:
-    return (int(candidate['action__path'].stat().st_size)
-            if readable(candidate['action__path']) else -1)
+    path = candidate['action__path']
+    st = stat(path)
+    if not st or not readable(path):
+        return -1
+    # Use the recursive size if it is computed by the size column
+    size = cached_size(path) if candidate['is_directory'] else None
+    return int(st.st_size) if size is None else size
 
 
 def _time(
         candidate: typing.Dict[str, typing.Any]
 ) -> typing.Any:
-    return (int(candidate['action__path'].stat().st_mtime)
-            if readable(candidate['action__path']) else 0)
+    st = stat(candidate['action__path'])
+    return (int(st.st_mtime)
+            if st and readable(candidate['action__path']) else 0)
 
 
 SORT_KEY_METHODS = {
@@ -10,7 +10,8 @@ import typing
 
 from defx.base.source import Base
 from defx.context import Context
-from defx.util import error, readable, safe_call
+from defx.snapshot import snapshot
+from defx.util import CancelToken, error, readable, safe_call
 
 
 class Source(Base):
@@ -46,26 +47,41 @@ class Source(Base):
         }
 
     def gather_candidates(
-            self, context: Context, path: Path
+            self, context: Context, path: Path,
+            token: typing.Optional[CancelToken] = None
     ) -> typing.List[typing.Dict[str, typing.Any]]:
-        candidates = []
-        if not readable(path) or not path.is_dir():
-            error(self.vim, f'"{path}" is not readable directory.')
-            return []
-        try:
-            for entry in path.iterdir():
-                candidates.append({
-                    'word': entry.name.replace('\n', '\\n') + (
-                        '/' if safe_call(entry.is_dir, False) else ''),
-                    'is_directory': safe_call(entry.is_dir, False),
-                    'action__path': entry,
-                })
-            if context.show_parent:
-                candidates.append({
-                    'word': '../',
-                    'is_directory': True,
-                    'action__path': path.resolve().parent,
-                })
-        except OSError:
-            pass
+        # Note: The large directory is not listed after {token} is
+        # cancelled.
+        snap = (snapshot(context.snapshot_file)
+                if context.snapshot_file else None)
+        entries = snap.get(str(path)) if snap else None
+        if entries is None:
+            if not readable(path) or not path.is_dir():
+                error(self.vim, f'"{path}" is not readable directory.')
+                return []
+            entries = []
+            try:
+                st = path.stat()
+                for entry in path.iterdir():
+                    if token and token.is_cancelled():
+                        return []
+                    entries.append(
+                        (entry.name, safe_call(entry.is_dir, False)))
+            except OSError:
+                pass
+            else:
+                if snap:
+                    snap.put(str(path), st, entries)
+
+        candidates = [{
+            'word': name.replace('\n', '\\n') + ('/' if is_dir else ''),
+            'is_directory': is_dir,
+            'action__path': path.joinpath(name),
+        } for [name, is_dir] in entries]
+        if context.show_parent:
+            candidates.append({
+                'word': '../',
+                'is_directory': True,
+                'action__path': path.resolve().parent,
+            })
         return candidates
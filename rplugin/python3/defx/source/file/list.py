@@ -11,7 +11,7 @@ import typing
 from defx.base.source import Base
 from defx.source.file import Source as File
 from defx.context import Context
-from defx.util import error, readable, safe_call
+from defx.util import CancelToken, error, readable, safe_call
 
 
 class Source(Base):
@@ -47,7 +47,8 @@ class Source(Base):
         }
 
     def gather_candidates(
-            self, context: Context, path: Path
+            self, context: Context, path: Path,
+            token: typing.Optional[CancelToken] = None
     ) -> typing.List[typing.Dict[str, typing.Any]]:
         if not readable(path):
             error(self.vim, f'"{path}" is not readable file.')
@@ -55,7 +56,7 @@ class Source(Base):
 
         if path.is_dir():
             # Fallback to file source
-            return File(self.vim).gather_candidates(context, path)
+            return File(self.vim).gather_candidates(context, path, token)
 
         candidates = []
         with path.open() as f:
@@ -0,0 +1,125 @@
+# ============================================================================
+# FILE: stats.py
+# AUTHOR: Shougo Matsushita <Shougo.Matsu at gmail.com>
+# License: MIT license
+# ============================================================================
+
+from collections import Counter
+from contextlib import contextmanager
+import typing
+
+from pynvim import Nvim
+
+
+def request_name(method: str, args: typing.Sequence[typing.Any]) -> str:
+    """
+    Returns the function name of the request.
+    """
+    if method == 'nvim_call_function' and args:
+        return str(args[0])
+    if method == 'nvim_command':
+        return 'command'
+    return method
+
+
+class RpcStats(object):
+    """
+    The counts of the RPC requests by the action and the function name.
+    The requests out of the actions are counted as "" action.
+    """
+
+    def __init__(self) -> None:
+        self.action = ''
+        self._counts: typing.Counter[typing.Tuple[str, str]] = Counter()
+        self._runs: typing.Counter[str] = Counter()
+        self._hooked: typing.Set[int] = set()
+
+    def hook(self, vim: Nvim) -> None:
+        """
+        Count the requests of {vim}.  The buffer and window requests
+        use the same session.
+        """
+        session = getattr(vim, '_session', None)
+        target: typing.Any = session if session else vim
+        if id(target) in self._hooked:
+            return
+        self._hooked.add(id(target))
+
+        if session:
+            request = session.request
+
+            def counted_request(method: str, *args: typing.Any,
+                                **kwargs: typing.Any) -> typing.Any:
+                self._counts[(self.action, request_name(method, args))] += 1
+                return request(method, *args, **kwargs)
+            session.request = counted_request
+            return
+
+        # Note: For the hosts without the session
+        call = vim.call
+        command = vim.command
+
+        def counted_call(name: str, *args: typing.Any,
+                         **kwargs: typing.Any) -> typing.Any:
+            self._counts[(self.action, name)] += 1
+            return call(name, *args, **kwargs)
+
+        def counted_command(*args: typing.Any,
+                            **kwargs: typing.Any) -> typing.Any:
+            self._counts[(self.action, 'command')] += 1
+            return command(*args, **kwargs)
+        vim.call = counted_call
+        vim.command = counted_command
+
+    @contextmanager
+    def scope(self, action: str) -> typing.Iterator[None]:
+        prev = self.action
+        self.action = action
+        self._runs[action] += 1
+        try:
+            yield
+        finally:
+            self.action = prev
+
+    def counts(self, action: str) -> typing.Dict[str, int]:
+        """
+        Returns the counts of {action} by the function name.
+        """
+        return {x[1]: y for [x, y] in self._counts.items()
+                if x[0] == action}
+
+    def total(self, action: str) -> int:
+        return sum(self.counts(action).values())
+
+    def clear(self) -> None:
+        self._counts.clear()
+        self._runs.clear()
+
+    def summary(self, max_functions: int = 5) -> typing.List[str]:
+        """
+        Returns the table of the requests per action.
+        """
+        actions = sorted(set([x[0] for x in self._counts]),
+                         key=lambda x: -self.total(x))
+        lines = ['{:<24} {:>6} {:>8} {:>8}  {}'.format(
+            'action', 'runs', 'calls', 'avg', 'functions')]
+        for action in actions:
+            counts = Counter(self.counts(action))
+            runs = self._runs[action]
+            total = sum(counts.values())
+            lines.append('{:<24} {:>6} {:>8} {:>8.1f}  {}'.format(
+                action if action else '(other)', runs, total,
+                total / runs if runs else total,
+                ' '.join([f'{x}:{y}' for [x, y]
+                          in counts.most_common(max_functions)])))
+        return lines
+
+
+_rpc_stats = RpcStats()
+
+
+def rpc_stats() -> RpcStats:
+    """
+    Returns the RPC counts shared by defx buffers.
+    """
+    return _rpc_stats
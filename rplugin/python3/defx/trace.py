@@ -0,0 +1,158 @@
+# ============================================================================
+# FILE: trace.py
+# AUTHOR: Shougo Matsushita <Shougo.Matsu at gmail.com>
+# License: MIT license
+# ============================================================================
+
+from collections import deque
+from contextlib import contextmanager
+import threading
+import time
+import typing
+
+from pynvim import Nvim
+
+# name, start(us), duration(us), depth, thread id, args
+Span = typing.Tuple[str, float, float, int, int, typing.Dict[str, str]]
+Trace = typing.List[Span]
+
+
+def _label(name: str, args: typing.Dict[str, str]) -> str:
+    return ' '.join([name] + list(args.values()))
+
+
+class Tracer(object):
+    """
+    The recorder of the nested spans.
+
+    The spans of the outermost span are kept as one trace.  The recent
+    {max_traces} traces are kept in the ring buffer.
+    """
+
+    def __init__(self, max_traces: int = 32) -> None:
+        self.enabled = False
+        self._traces: typing.Deque[Trace] = deque(maxlen=max_traces)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # The hooked sessions and the original requests
+        self._hooked: typing.Dict[
+            int, typing.Tuple[typing.Any, typing.Callable[..., typing.Any]]
+        ] = {}
+
+    @contextmanager
+    def span(self, name: str, **args: str) -> typing.Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+
+        depth: int = getattr(self._local, 'depth', 0)
+        if not depth:
+            self._local.trace = []
+        trace: Trace = self._local.trace
+
+        # Note: The span is appended first to keep the start order
+        index = len(trace)
+        trace.append((name, 0, 0, depth, threading.get_ident(), args))
+        self._local.depth = depth + 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self._local.depth = depth
+            trace[index] = (name, start * 1e6, (end - start) * 1e6,
+                            depth, threading.get_ident(), args)
+            if not depth:
+                with self._lock:
+                    self._traces.append(trace)
+
+    def is_tracing(self) -> bool:
+        return bool(getattr(self._local, 'depth', 0))
+
+    def hook(self, vim: Nvim) -> None:
+        """
+        Record the requests of {vim} as "rpc" spans in the other spans.
+        The buffer requests use the same session.
+        """
+        session = getattr(vim, '_session', None)
+        if not session or id(session) in self._hooked:
+            return
+        request = session.request
+        self._hooked[id(session)] = (session, request)
+
+        def traced_request(method: str, *args: typing.Any,
+                           **kwargs: typing.Any) -> typing.Any:
+            if not self.enabled or not self.is_tracing():
+                return request(method, *args, **kwargs)
+            name = method
+            if (method in ['nvim_call_function', 'nvim_command'] and
+                    args and isinstance(args[0], str)):
+                name += ' ' + args[0].split(' ')[0]
+            with self.span('rpc', method=name):
+                return request(method, *args, **kwargs)
+        session.request = traced_request
+
+    def stop(self) -> None:
+        """
+        Disable the tracer and restore the requests of the hooked
+        sessions.  The recorded traces are kept.
+        """
+        self.enabled = False
+        for [session, request] in self._hooked.values():
+            session.request = request
+        self._hooked.clear()
+
+    def traces(self) -> typing.List[Trace]:
+        with self._lock:
+            return list(self._traces)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._traces.clear()
+
+    def chrome_trace(self) -> typing.Dict[str, typing.Any]:
+        """
+        Returns the traces in Chrome trace event format.  It can be
+        loaded by chrome://tracing or Perfetto.
+        """
+        events = []
+        for trace in self.traces():
+            for [name, start, duration, depth, tid, args] in trace:
+                events.append({
+                    'name': _label(name, args),
+                    'cat': name, 'ph': 'X', 'pid': 1, 'tid': tid,
+                    'ts': start, 'dur': duration, 'args': args,
+                })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def summary(self) -> typing.List[str]:
+        """
+        Returns the table of the total times by the span name.
+        """
+        totals: typing.Dict[str, typing.List[float]] = {}
+        for trace in self.traces():
+            for span in trace:
+                name = _label(span[0], span[5])
+                entry = totals.setdefault(name, [0, 0, 0])
+                entry[0] += 1
+                entry[1] += span[2]
+                entry[2] = max(entry[2], span[2])
+
+        lines = ['{:<40} {:>6} {:>10} {:>10} {:>10}'.format(
+            'span', 'count', 'total(ms)', 'avg(ms)', 'max(ms)')]
+        for [name, [count, duration, maximum]] in sorted(
+                totals.items(), key=lambda x: -x[1][1]):
+            lines.append('{:<40} {:>6} {:>10.2f} {:>10.2f} {:>10.2f}'.format(
+                name[: 40], int(count), duration / 1000,
+                duration / count / 1000, maximum / 1000))
+        return lines
+
+
+_tracer = Tracer()
+
+
+def tracer() -> Tracer:
+    """
+    Returns the tracer shared by defx buffers.
+    """
+    return _tracer
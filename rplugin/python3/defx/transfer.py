@@ -0,0 +1,330 @@
+# ============================================================================
+# FILE: transfer.py
+# AUTHOR: Shougo Matsushita <Shougo.Matsu at gmail.com>
+# License: MIT license
+# ============================================================================
+
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_EXCEPTION
+from pathlib import Path
+import errno
+import os
+import shutil
+import stat
+import sys
+import threading
+import time
+import typing
+
+Callback = typing.Callable[['Transfer'], None]
+Progress = typing.Callable[[int], None]
+
+# Linux ioctl to share the extents between files(btrfs, xfs)
+FICLONE = 0x40049409
+
+# The errors which mean the syscall is not available for the files
+_FALLBACK_ERRORS = {
+    errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP,
+    errno.ENOTSUP, errno.EBADF, errno.ETXTBSY, errno.EPERM,
+}
+
+
+def format_size(size: float) -> str:
+    if size < 1024:
+        return f'{int(size)}B'
+    for suffix in ['KB', 'MB', 'GB', 'TB']:
+        size /= 1024
+        if size < 1024:
+            break
+    return f'{size:.1f}{suffix}'
+
+
+def reflink(fsrc: int, fdest: int) -> bool:
+    """
+    Clone {fsrc} to {fdest} by copy-on-write.
+    """
+    if not sys.platform.startswith('linux'):
+        return False
+    try:
+        import fcntl
+        fcntl.ioctl(fdest, FICLONE, fsrc)
+    except (ImportError, OSError):
+        return False
+    return True
+
+
+def copy_range(fsrc: int, fdest: int, offset: int, length: int,
+               chunk_size: int, progress: Progress,
+               cancelled: typing.Callable[[], bool]) -> None:
+    """
+    Copy [offset, offset + length) of {fsrc} to the same offset of
+    {fdest}.  The kernel copy is used if possible.
+    """
+    start = offset
+    end = offset + length
+
+    # Note: Some filesystems return 0 instead of the error.  The next
+    # method continues from the offset.
+    if hasattr(os, 'copy_file_range'):
+        try:
+            while offset < end and not cancelled():
+                copied = os.copy_file_range(
+                    fsrc, fdest, min(chunk_size, end - offset),
+                    offset, offset)
+                if copied == 0:
+                    break
+                offset += copied
+                progress(copied)
+        except OSError as e:
+            if e.errno not in _FALLBACK_ERRORS:
+                raise
+        if offset >= end or cancelled():
+            return
+
+    if hasattr(os, 'sendfile') and sys.platform.startswith('linux'):
+        try:
+            os.lseek(fdest, offset, os.SEEK_SET)
+            while offset < end and not cancelled():
+                sent = os.sendfile(
+                    fdest, fsrc, offset, min(chunk_size, end - offset))
+                if sent == 0:
+                    break
+                offset += sent
+                progress(sent)
+        except OSError as e:
+            if e.errno not in _FALLBACK_ERRORS:
+                raise
+        if offset >= end or cancelled():
+            return
+
+    os.lseek(fsrc, offset, os.SEEK_SET)
+    os.lseek(fdest, offset, os.SEEK_SET)
+    while offset < end and not cancelled():
+        chunk = os.read(fsrc, min(chunk_size, end - offset))
+        if not chunk:
+            break
+        os.write(fdest, chunk)
+        offset += len(chunk)
+        progress(len(chunk))
+
+    if offset < end and not cancelled():
+        raise OSError(errno.EIO, 'Short copy: {}/{} bytes'.format(
+            offset - start, length))
+
+
+def data_segments(fd: int, size: int
+                  ) -> typing.List[typing.Tuple[int, int]]:
+    """
+    Returns the (offset, length) data segments of the sparse file.
+    """
+    segments: typing.List[typing.Tuple[int, int]] = []
+    offset = 0
+    while offset < size:
+        try:
+            start = os.lseek(fd, offset, os.SEEK_DATA)
+        except OSError as e:
+            if e.errno == errno.ENXIO:
+                # Only holes remain
+                break
+            raise
+        end = os.lseek(fd, start, os.SEEK_HOLE)
+        segments.append((start, end - start))
+        offset = end
+    return segments
+
+
+def copy_file(src: Path, dest: Path, chunk_size: int, progress: Progress,
+              cancelled: typing.Callable[[], bool]) -> bool:
+    """
+    Copy the file contents and the metadata.
+    Returns False if it is cancelled.  The partial {dest} is removed.
+
+    1. reflink(FICLONE)
+    2. Data segments only for sparse files(SEEK_DATA/SEEK_HOLE)
+    3. copy_file_range()/sendfile()/read() by chunks
+    """
+    with src.open('rb') as fsrc, dest.open('wb') as fdest:
+        ifd = fsrc.fileno()
+        ofd = fdest.fileno()
+        st = os.fstat(ifd)
+        size = st.st_size
+
+        if size and reflink(ifd, ofd):
+            progress(size)
+        else:
+            is_sparse = (hasattr(os, 'SEEK_DATA') and
+                         hasattr(st, 'st_blocks') and
+                         st.st_blocks * 512 < size)
+            segments = [(0, size)]
+            if is_sparse:
+                try:
+                    segments = data_segments(ifd, size)
+                except OSError:
+                    pass
+            for [offset, length] in segments:
+                copy_range(ifd, ofd, offset, length,
+                           chunk_size, progress, cancelled)
+            if is_sparse:
+                # Restore the trailing hole
+                os.ftruncate(ofd, size)
+                progress(size - sum([x[1] for x in segments]))
+
+    if cancelled():
+        # Note: The partial file must not look complete by the mtime
+        dest.unlink()
+        return False
+    shutil.copystat(str(src), str(dest))
+    return True
+
+
+class Transfer(object):
+    """
+    Copy the (src, dest) pairs by the thread pool.
+
+    Directories are created by the planner and the files are copied in
+    parallel by chunks.  See copy_file() for the kernel fast paths.
+    """
+
+    def __init__(self, pairs: typing.List[typing.Tuple[Path, Path]],
+                 workers: int = 8, chunk_size: int = 1024 * 1024) -> None:
+        self.pairs = pairs
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.errors: typing.List[str] = []
+        # The removed partial files
+        self.cancelled: typing.List[Path] = []
+        self.files_done = 0
+        self.files_total = 0
+        self.bytes_done = 0
+        self.bytes_total = 0
+        self.started = 0.0
+        self.finished = 0.0
+
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._thread: typing.Optional[threading.Thread] = None
+
+    def start(self, on_progress: typing.Optional[Callback] = None,
+              on_done: typing.Optional[Callback] = None,
+              interval: float = 0.5) -> None:
+        self._thread = threading.Thread(
+            target=self.run, args=(on_progress, on_done, interval),
+            daemon=True)
+        self._thread.start()
+
+    def wait(self) -> None:
+        if self._thread:
+            self._thread.join()
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def is_running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def elapsed(self) -> float:
+        if not self.started:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    def throughput(self) -> float:
+        """
+        Returns copied bytes per second.
+        """
+        elapsed = self.elapsed()
+        return self.bytes_done / elapsed if elapsed > 0 else 0.0
+
+    def status(self) -> str:
+        return '{}/{} files {}/{} {}/s'.format(
+            self.files_done, self.files_total,
+            format_size(self.bytes_done), format_size(self.bytes_total),
+            format_size(self.throughput()))
+
+    def run(self, on_progress: typing.Optional[Callback] = None,
+            on_done: typing.Optional[Callback] = None,
+            interval: float = 0.5) -> None:
+        self.started = time.time()
+        files: typing.List[typing.Tuple[Path, Path, int]] = []
+        dirs: typing.List[typing.Tuple[Path, Path]] = []
+        for [src, dest] in self.pairs:
+            try:
+                self._plan(src, dest, files, dirs)
+            except OSError as e:
+                self.errors.append(str(e))
+        self.files_total = len(files)
+        self.bytes_total = sum([x[2] for x in files])
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(self._copy, src, dest)
+                       for [src, dest, _] in files]
+            not_done = set(futures)
+            while not_done:
+                [_, not_done] = wait(not_done, timeout=interval,
+                                     return_when=FIRST_EXCEPTION)
+                if on_progress and not_done:
+                    on_progress(self)
+
+        # Note: Directory stat must be copied after the contents
+        for [src, dest] in reversed(dirs):
+            try:
+                shutil.copystat(str(src), str(dest))
+            except OSError:
+                pass
+
+        self.finished = time.time()
+        if on_done:
+            on_done(self)
+
+    def _plan(self, src: Path, dest: Path,
+              files: typing.List[typing.Tuple[Path, Path, int]],
+              dirs: typing.List[typing.Tuple[Path, Path]]) -> None:
+        if not src.is_dir():
+            st = src.stat()
+            if self._is_regular(src, st):
+                files.append((src, dest, st.st_size))
+            return
+
+        for [root, dirnames, filenames] in os.walk(
+                str(src), followlinks=True):
+            root_dest = dest.joinpath(os.path.relpath(root, str(src)))
+            root_dest.mkdir(parents=True, exist_ok=True)
+            dirs.append((Path(root), root_dest))
+            for name in filenames:
+                path = Path(root).joinpath(name)
+                try:
+                    st = path.stat()
+                except OSError as e:
+                    self.errors.append(str(e))
+                    continue
+                if self._is_regular(path, st):
+                    files.append((path, root_dest.joinpath(name),
+                                  st.st_size))
+
+    def _is_regular(self, path: Path, st: os.stat_result) -> bool:
+        # Note: Opening FIFO blocks the worker
+        if stat.S_ISREG(st.st_mode):
+            return True
+        self.errors.append(f'"{path}" is not a regular file.  Skip.')
+        return False
+
+    def _copy(self, src: Path, dest: Path) -> None:
+        if self.is_cancelled():
+            return
+        try:
+            done = copy_file(src, dest, self.chunk_size,
+                             self._add_bytes, self.is_cancelled)
+        except OSError as e:
+            with self._lock:
+                self.errors.append(str(e))
+            return
+        with self._lock:
+            if done:
+                self.files_done += 1
+            else:
+                self.cancelled.append(dest)
+
+    def _add_bytes(self, size: int) -> None:
+        with self._lock:
+            self.bytes_done += size
@@ -10,12 +10,19 @@ from sys import executable, base_exec_prefix
 import importlib.util
 import os
 import shutil
+import threading
 import typing
 
 UserContext = typing.Dict[str, typing.Any]
 Candidate = typing.Dict[str, typing.Any]
 Candidates = typing.List[Candidate]
 
+_readable_cache: typing.Dict[str, bool] = {}
+_stat_cache: typing.Dict[str, typing.Optional[os.stat_result]] = {}
+# Note: The widths are not changed in the session
+_strwidth_cache: typing.Dict[str, int] = {}
+MAX_STRWIDTH_CACHE = 100000
+
 
 def cd(vim: Nvim, path: str) -> None:
     vim.call('defx#util#cd', path)
@@ -43,6 +50,11 @@ def error(vim: Nvim, expr: typing.Any) -> None:
     """
     if isinstance(expr, set):
         expr = [str(x) for x in expr]
+    if (threading.current_thread() is not threading.main_thread() and
+            hasattr(vim, 'async_call')):
+        # Note: Vim must be called in the main thread
+        vim.async_call(vim.call, 'defx#util#print_error', str(expr))
+        return
     vim.call('defx#util#print_error', str(expr))
 
 
@@ -74,15 +86,68 @@ def import_plugin(path: Path, source: str,
 
 def readable(path: Path) -> bool:
     """
-    Check {path} is readable.
+    Check {path} is readable.  The result is cached until
+    clear_cache().
     """
+    # Note: The cache may be cleared by the other thread.  The value is
+    # returned by the local variable.
+    key = str(path)
+    try:
+        return _readable_cache[key]
+    except KeyError:
+        pass
+
+    # Note: os.access() follows the symlinks.  The broken link and the
+    # symlink loop are not readable.
     try:
-        if os.access(str(path), os.R_OK) and path.resolve():
-            return True
-        else:
-            return False
-    except Exception:
-        return False
+        is_readable = os.access(key, os.R_OK)
+    except (OSError, ValueError):
+        is_readable = False
+    _readable_cache[key] = is_readable
+    return is_readable
+
+
+def stat(path: Path) -> typing.Optional[os.stat_result]:
+    """
+    Returns the stat result of {path} or None.  The result is cached
+    until clear_cache().
+    """
+    key = str(path)
+    try:
+        return _stat_cache[key]
+    except KeyError:
+        pass
+
+    st: typing.Optional[os.stat_result]
+    try:
+        st = os.stat(key)
+    except (OSError, ValueError):
+        st = None
+    _stat_cache[key] = st
+    return st
+
+
+def clear_cache() -> None:
+    """
+    Clear the readable() and stat() cache.  It is called per refresh.
+    """
+    _readable_cache.clear()
+    _stat_cache.clear()
+
+
+class CancelToken(object):
+    """
+    The cancellation flag checked by the loops in the threads.
+    """
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    def is_cancelled(self) -> bool:
+        return self._event.is_set()
 
 
 def safe_call(fn: typing.Callable[..., typing.Any],
@@ -118,9 +183,26 @@ def get_python_exe() -> str:
 
 
 def strwidth(vim: Nvim, word: str) -> int:
-    return (int(vim.call('strwidth', word))
-            if len(word) != len(bytes(word, 'utf-8',
-                                      'surrogatepass')) else len(word))
+    if len(word) == len_bytes(word):
+        return len(word)
+    if word not in _strwidth_cache:
+        _strwidth_cache[word] = int(vim.call('strwidth', word))
+    return _strwidth_cache[word]
+
+
+def strwidths(vim: Nvim, words: typing.List[str]) -> typing.List[int]:
+    """
+    Returns the display widths of {words}.  The widths of the new
+    non-ASCII words are calculated by one request.
+    """
+    new_words = list(set([x for x in words if x not in _strwidth_cache
+                          and len(x) != len_bytes(x)]))
+    if new_words:
+        if len(_strwidth_cache) > MAX_STRWIDTH_CACHE:
+            _strwidth_cache.clear()
+        _strwidth_cache.update(zip(new_words, [int(x) for x in vim.call(
+            'map', new_words, 'strwidth(v:val)')]))
+    return [strwidth(vim, x) for x in words]
 
 
 def len_bytes(word: str) -> int:
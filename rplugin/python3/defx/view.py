@@ -4,19 +4,27 @@
 # License: MIT license
 # ============================================================================
 
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
 from pynvim import Nvim
 from pynvim.api import Buffer
 import copy
-import time
+import threading
 import typing
 
 from defx.clipboard import Clipboard
 from defx.context import Context
-from defx.defx import Defx
+from defx.defx import Defx, directory_stat
+from defx.job import Jobs
+from defx.plugins import plugins
+from defx.preview import Preview, hide_image_preview
 from defx.session import Session
-from defx.util import Candidate
-from defx.util import error, import_plugin, len_bytes, readable
+from defx.snapshot import Snapshot, snapshot
+from defx.stats import rpc_stats
+from defx.trace import tracer
+from defx.util import Candidate, Candidates
+from defx.util import clear_cache, error, len_bytes, readable
 
 Highlights = typing.List[typing.Tuple[str, int, int]]
 
@@ -26,8 +34,14 @@ class View(object):
     def __init__(self, vim: Nvim, index: int) -> None:
         self._vim: Nvim = vim
         self._defxs: typing.List[Defx] = []
-        self._candidates: typing.List[typing.Dict[str, typing.Any]] = []
+        # Note: The forced redraws in the batch gather the candidates
+        # once when they are used.
+        self._tree_pending = False
+        self._candidates = []
         self._clipboard = Clipboard()
+        self._jobs = Jobs()
+        # The views of the plugin.  The file operations patch them.
+        self._views: typing.List[View] = [self]
         self._bufnr = -1
         self._tabnr = -1
         self._prev_bufnr = -1
@@ -37,16 +51,49 @@ class View(object):
         self._buffer: Buffer = None
         self._prev_action = ''
         self._prev_syntaxes: typing.List[str] = []
-        self._prev_highlight_commands: typing.List[str] = []
+        # The hash of the column highlights and the highlight generation
+        self._highlight_key: typing.Tuple[int, int] = (0, -1)
         self._winrestcmd = ''
         self._has_preview_window = False
         self._session_version = '1.0'
+        # Note: The sessions are not limited by max_cursor_history.  They
+        # are added by add_session action or session file only, not per
+        # visited directory, and removing them loses the user data.
         self._sessions: typing.Dict[str, Session] = {}
+        # The last (text, mtime) of the session file
+        self._session_saved: typing.Tuple[str, float] = ('', -1)
         self._previewed_target: typing.Optional[Candidate] = None
         self._previewed_img = ''
+        self._preview = Preview()
         self._ns: int = -1
         self._has_textprop = False
         self._proptypes: typing.Set[str] = set()
+        self._all_sources: typing.Dict[str, typing.Any] = {}
+        self._all_columns: typing.Dict[str, typing.Any] = {}
+        self._narrow_base: typing.Optional[Candidates] = None
+        self._narrow_keys: typing.List[str] = []
+        self._narrow_parents: typing.List[int] = []
+        self._narrow_roots: typing.List[int] = []
+        self._narrow_query = ''
+        self._narrow_matches: typing.List[int] = []
+        # Note: The redraws in the batch are flushed once.  True is the
+        # forced redraw.
+        self._redraw_depth = 0
+        self._redraw_pending: typing.Optional[bool] = None
+        # The (path, index, offset) of search_file() in the batch
+        self._search_pending: typing.Optional[
+            typing.Tuple[Path, int, int]] = None
+
+    @property
+    def _candidates(self) -> Candidates:
+        if self._tree_pending:
+            self._tree_pending = False
+            self._init_tree()
+        return self._tree
+
+    @_candidates.setter
+    def _candidates(self, candidates: Candidates) -> None:
+        self._tree = candidates
 
     def init(self, context: typing.Dict[str, typing.Any]) -> None:
         self._context = self._init_context(context)
@@ -58,6 +105,10 @@ class View(object):
             [x for x in range(1, self._vim.call('winnr', '$'))
              if self._vim.call('getwinvar', x, '&previewwindow')]) > 0
 
+        if self._context.profile:
+            tracer().enabled = True
+            tracer().hook(self._vim)
+
         if self._vim.call('defx#util#has_textprop'):
             self._has_textprop = True
         else:
@@ -65,11 +116,11 @@ class View(object):
 
     def init_paths(self, paths: typing.List[typing.List[str]],
                    context: typing.Dict[str, typing.Any],
-                   clipboard: Clipboard
+                   clipboard: Clipboard, jobs: Jobs
                    ) -> bool:
         self.init(context)
 
-        initialized = self._init_defx(clipboard)
+        initialized = self._init_defx(clipboard, jobs)
 
         # Window check
         if self._vim.call('win_getid') != self._winid:
@@ -86,6 +137,14 @@ class View(object):
         self._update_defx_paths(paths)
 
         self._init_columns(self._context.columns.split(':'))
+
+        # Note: Paint the last known tree from the snapshot and check the
+        # changed directories later.
+        snap = (snapshot(self._context.snapshot_file)
+                if self._context.snapshot_file else None)
+        if snap:
+            snap.is_painting = True
+
         self.redraw(True)
 
         if self._context.session_file:
@@ -94,6 +153,10 @@ class View(object):
             for [index, [source_name, path]] in enumerate(paths):
                 self._check_session(index, path)
 
+        if snap:
+            snap.is_painting = False
+            self._revalidate_snapshot(snap)
+
         for defx in self._defxs:
             self._init_cursor(defx)
 
@@ -108,6 +171,21 @@ class View(object):
         """
         Do "action" action.
         """
+        with tracer().span('action', action=action_name), \
+                rpc_stats().scope(action_name), self.batch_redraw():
+            self._do_action(action_name, action_args, new_context)
+
+    def _do_action(self, action_name: str,
+                   action_args: typing.List[str],
+                   new_context: typing.Dict[str, typing.Any]) -> None:
+        clear_cache()
+        if action_name != 'narrow' and self._narrow_base is not None:
+            # Note: The other actions work in the whole tree.  The
+            # positions are converted to the restored candidates.
+            new_context = dict(new_context)
+            for key in ['cursor', 'visual_start', 'visual_end']:
+                new_context[key] = self._narrow_position(new_context[key])
+            self._clear_narrow(new_context['cursor'])
         cursor = new_context['cursor']
         visual_start = new_context['visual_start']
         visual_end = new_context['visual_end']
@@ -146,6 +224,8 @@ class View(object):
 
     def close_preview(self) -> None:
         self._vim.call('defx#util#close_async_job')
+        hide_image_preview()
+        self._previewed_img = ''
 
         if not self._has_preview_window:
             self._vim.command('pclose!')
@@ -193,41 +273,90 @@ class View(object):
     def redraw(self, is_force: bool = False) -> None:
         """
         Redraw defx buffer.
+        In the batch, the candidates are gathered when they are used and
+        the buffer is redrawn by flush_redraw() at the end of each action.
         """
+        with tracer().span('redraw'):
+            clear_cache()
+            if self._redraw_depth > 0:
+                self._tree_pending = self._tree_pending or is_force
+                self._redraw_pending = bool(self._redraw_pending or is_force)
+                return
 
-        start = time.time()
-
-        [info] = self._vim.call('getbufinfo', self._bufnr)
-        restview = self._vim.call('winsaveview')
-
-        if is_force:
+            if is_force:
+                self._init_tree()
+            self._redraw(is_force)
+
+    @contextmanager
+    def batch_redraw(self) -> typing.Iterator[None]:
+        self._redraw_depth += 1
+        try:
+            yield
+        finally:
+            self._redraw_depth -= 1
+        # Note: The nested actions are flushed too.  The narrow action is
+        # called while the input() of the outer action.
+        self.flush_redraw()
+
+    def flush_redraw(self) -> None:
+        """
+        Redraw the pending redraw in the batch.
+        """
+        if self._redraw_pending is None:
+            return
+        is_force = self._redraw_pending
+        self._redraw_pending = None
+        search = self._search_pending
+        self._search_pending = None
+        with tracer().span('redraw'):
+            self._redraw(is_force)
+        if search:
+            self._search_file(*search)
+
+    def _init_tree(self) -> None:
+        trace = tracer()
+        with trace.span('candidates'):
             self._init_candidates()
+        with trace.span('column_length'):
             self._init_column_length()
 
-        for column in self._columns:
-            column.on_redraw(self, self._context)
-
-        lines = []
-        columns_highlights = []
-        for (i, candidate) in enumerate(self._candidates):
-            (text, highlights) = self._get_columns_text(
-                self._context, candidate)
-            lines.append(text)
-            columns_highlights += ([(x[0], i, x[1], x[1] + x[2])
-                                    for x in highlights])
+    def _redraw(self, is_force: bool) -> None:
+        trace = tracer()
 
-        self._buffer.options['modifiable'] = True
+        infos = self._vim.call('getbufinfo', self._bufnr)
+        if not infos:
+            # The buffer is wiped out in the batch
+            return
+        [info] = infos
+        restview = self._vim.call('winsaveview')
 
-        # NOTE: Different len of buffer line replacement cause cursor jump
-        if len(lines) >= len(self._buffer):
-            self._buffer[:] = lines[:len(self._buffer)]
-            self._buffer.append(lines[len(self._buffer):])
-        else:
-            self._buffer[len(lines):] = []
-            self._buffer[:] = lines
+        with trace.span('render'):
+            for column in self._columns:
+                column.on_redraw(self, self._context)
+
+            lines = []
+            columns_highlights = []
+            for (i, candidate) in enumerate(self._candidates):
+                (text, highlights) = self._get_columns_text(
+                    self._context, candidate)
+                lines.append(text)
+                columns_highlights += ([(x[0], i, x[1], x[1] + x[2])
+                                        for x in highlights])
+
+        with trace.span('buffer_write'):
+            self._buffer.options['modifiable'] = True
+
+            # NOTE: Different len of buffer line replacement cause cursor
+            # jump
+            if len(lines) >= len(self._buffer):
+                self._buffer[:] = lines[:len(self._buffer)]
+                self._buffer.append(lines[len(self._buffer):])
+            else:
+                self._buffer[len(lines):] = []
+                self._buffer[:] = lines
 
-        self._buffer.options['modifiable'] = False
-        self._buffer.options['modified'] = False
+            self._buffer.options['modifiable'] = False
+            self._buffer.options['modified'] = False
 
         # TODO: How to set cursor position for other buffer when
         #   stay in current buffer
@@ -237,15 +366,14 @@ class View(object):
             if prev:
                 self.search_file(prev['action__path'], prev['_defx_index'])
             if is_force:
-                self._init_column_syntax()
+                with trace.span('syntax'):
+                    self._init_column_syntax()
 
         # Update highlights
         # Note: update_highlights() must be called after init_column_syntax()
         if columns_highlights:
-            self._update_highlights(columns_highlights)
-
-        if self._context.profile:
-            error(self._vim, f'redraw time = {time.time() - start}')
+            with trace.span('highlight'):
+                self._update_highlights(columns_highlights)
 
     def get_cursor_candidate(
             self, cursor: int) -> typing.Dict[str, typing.Any]:
@@ -277,26 +405,33 @@ class View(object):
            path: str, cursor: int, save_history: bool = True) -> None:
         history = defx._cursor_history
 
+        max_history = self._context.max_cursor_history
+
         # Save previous cursor position
         candidate = self.get_cursor_candidate(cursor)
         if candidate:
+            # Note: The old histories are removed first
+            history.pop(defx._cwd, None)
             history[defx._cwd] = candidate['action__path']
+            while max_history > 0 and len(history) > max_history:
+                history.pop(next(iter(history)))
 
         if save_history:
             global_histories = self._vim.vars['defx#_histories']
             global_histories.append([defx._source.name, defx._cwd])
+            if max_history > 0:
+                global_histories = global_histories[-max_history:]
             self._vim.vars['defx#_histories'] = global_histories
 
         if source_name != defx._source.name:
-            if source_name not in self._all_sources:
+            source = self._get_source(source_name)
+            if not source:
                 error(self._vim, 'Invalid source_name:' + source_name)
                 return
 
             # Replace with new defx
             self._defxs[defx._index] = Defx(
-                self._vim, self._context,
-                self._all_sources[source_name],
-                path, defx._index)
+                self._vim, self._context, source, path, defx._index)
             defx = self._defxs[defx._index]
 
         defx.cd(path)
@@ -314,6 +449,9 @@ class View(object):
             'silent doautocmd <nomodeline> User DefxDirChanged')
 
     def search_file(self, path: Path, index: int) -> bool:
+        return self._search_file(path, index, 0)
+
+    def _search_file(self, path: Path, index: int, offset: int) -> bool:
         target = str(path)
         if target and target[-1] == '/':
             target = target[:-1]
@@ -321,7 +459,12 @@ class View(object):
         if pos < 0:
             return False
 
-        self._vim.call('cursor', [pos + 1, 1])
+        if self._redraw_pending is not None:
+            # Note: The cursor must be moved in the redrawn buffer
+            self._search_pending = (Path(target), index, offset)
+            return True
+
+        self._vim.call('cursor', [pos + 1 + offset, 1])
         return True
 
     def search_recursive(self, path: Path, index: int) -> bool:
@@ -339,16 +482,124 @@ class View(object):
         self.redraw()
         return self.search_file(path, index)
 
+    def narrow(self, query: str) -> None:
+        """
+        Narrow the candidates by {query} in memory.  The ancestors of
+        the matched candidates and the roots are kept.  If {query} is
+        empty, the candidates are restored.
+
+        The whole candidates are kept until the other action.
+        """
+        if self._narrow_base is None:
+            self._init_narrow()
+        base = typing.cast(Candidates, self._narrow_base)
+
+        if not query:
+            self._candidates = base
+            self._narrow_base = None
+            self.redraw()
+            return
+
+        query = query.lower()
+        if self._narrow_query and query.startswith(self._narrow_query):
+            # The matches of the extended query are in the previous
+            # matches
+            indexes = self._narrow_matches
+        else:
+            indexes = list(range(len(base)))
+        keys = self._narrow_keys
+        matches = [x for x in indexes if query in keys[x]]
+        self._narrow_query = query
+        self._narrow_matches = matches
+
+        visible = set(self._narrow_roots)
+        for index in matches:
+            while index >= 0 and index not in visible:
+                visible.add(index)
+                index = self._narrow_parents[index]
+        self._candidates = [base[x] for x in sorted(visible)]
+        self.redraw()
+        # Note: The cursor must be moved in the redrawn buffer
+        self.flush_redraw()
+
+        if matches:
+            first = base[matches[0]]
+            self._vim.call('cursor', [
+                next(i for [i, x] in enumerate(self._candidates)
+                     if x is first) + 1, 1])
+
+    def _init_narrow(self) -> None:
+        self._narrow_base = self._candidates
+        self._narrow_keys = [x['word'].lower() for x in self._candidates]
+        self._narrow_query = ''
+        self._narrow_matches = []
+
+        # The parent indexes.  The root candidates are always shown.
+        self._narrow_roots = [i for [i, x] in enumerate(self._candidates)
+                              if x['is_root']]
+        parents: typing.List[int] = []
+        stack: typing.List[typing.Tuple[int, int]] = []
+        root = -1
+        for [i, candidate] in enumerate(self._candidates):
+            if candidate['is_root']:
+                root = i
+                stack = []
+                parents.append(-1)
+                continue
+            level = candidate['level']
+            while stack and stack[-1][0] >= level:
+                stack.pop()
+            parents.append(stack[-1][1] if stack else root)
+            if candidate['is_opened_tree']:
+                stack.append((level, i))
+        self._narrow_parents = parents
+
+    def _narrow_position(self, pos: int) -> int:
+        """
+        Returns the position of the narrowed candidate in the whole
+        candidates.
+        """
+        candidate = self.get_cursor_candidate(pos) if pos > 0 else {}
+        if not candidate or self._narrow_base is None:
+            return pos
+        return next(i for [i, x] in enumerate(self._narrow_base)
+                    if x is candidate) + 1
+
+    def _clear_narrow(self, cursor: int = 0) -> None:
+        """
+        Restore the whole candidates.  If {cursor} is given, the buffer
+        is redrawn and the cursor is moved.
+        """
+        if self._narrow_base is None:
+            return
+        self._candidates = self._narrow_base
+        self._narrow_base = None
+        if not cursor:
+            return
+
+        self._redraw(False)
+        if self._buffer == self._vim.current.buffer:
+            self._vim.call('cursor', [cursor, 1])
+
+    def get_tree_candidates(self) -> Candidates:
+        """
+        Returns the candidates including the hidden candidates by narrow.
+        """
+        return (self._narrow_base if self._narrow_base is not None
+                else self._candidates)
+
     def update_candidates(self) -> None:
         # Update opened/selected state
         for defx in self._defxs:
             defx._opened_candidates = set()
             defx._selected_candidates = set()
-        for [i, candidate] in [x for x in enumerate(self._candidates)
+        # Note: The hidden candidates by narrow are opened too
+        candidates = self.get_tree_candidates()
+        for [i, candidate] in [x for x in enumerate(candidates)
                                if x[1]['is_opened_tree']]:
             defx = self._defxs[candidate['_defx_index']]
             defx._opened_candidates.add(str(candidate['action__path']))
-        for [i, candidate] in [x for x in enumerate(self._candidates)
+        for [i, candidate] in [x for x in enumerate(candidates)
                                if x[1]['is_selected']]:
             defx = self._defxs[candidate['_defx_index']]
             defx._selected_candidates.add(str(candidate['action__path']))
@@ -391,6 +642,62 @@ class View(object):
         self._candidates = (self._candidates[: pos + 1] +
                             children + self._candidates[pos + 1:])
 
+    def refresh_directory(self, path: Path, index: int) -> None:
+        """
+        Gather the children of the opened directory {path} again.  Only
+        {path} is listed.  The subtrees of the opened children are kept.
+        """
+        pos = self.get_candidate_pos(path, index)
+        if pos < 0:
+            return
+
+        target = self._candidates[pos]
+        if not target['is_opened_tree'] and not target['is_root']:
+            return
+
+        # Note: The children of the root have the same level
+        is_root = target['is_root']
+        base_level = 0 if is_root else target['level'] + 1
+        end = pos + 1
+        subtrees: typing.Dict[Path, Candidates] = {}
+        subtree: Candidates = []
+        for candidate in self._candidates[pos + 1:]:
+            if (candidate['is_root'] or
+                    candidate['_defx_index'] != index or
+                    (not is_root and candidate['level'] < base_level)):
+                break
+            if candidate['level'] == base_level:
+                subtree = []
+                if candidate['is_opened_tree']:
+                    subtrees[candidate['action__path']] = subtree
+            else:
+                subtree.append(candidate)
+            end += 1
+
+        self.update_candidates()
+        defx = self._defxs[index]
+        children: Candidates = []
+        for candidate in defx._gather_candidates(str(path), base_level):
+            candidate_path = candidate['action__path']
+            candidate['_defx_index'] = index
+            candidate['is_selected'] = (
+                str(candidate_path) in defx._selected_candidates)
+            children.append(candidate)
+            if candidate_path in subtrees:
+                candidate['is_opened_tree'] = True
+                children += subtrees[candidate_path]
+            elif (candidate['is_directory'] and
+                  str(candidate_path) in defx._nested_candidates):
+                candidate['is_opened_tree'] = True
+                subtree = defx.tree_candidates(
+                    str(candidate_path), base_level + 1, base_level + 1)
+                for child in subtree:
+                    child['_defx_index'] = index
+                children += subtree
+
+        self._candidates = (self._candidates[: pos + 1] +
+                            children + self._candidates[end:])
+
     def close_tree(self, path: Path, index: int) -> None:
         # Search insert position
         pos = self.get_candidate_pos(path, index)
@@ -418,6 +725,117 @@ class View(object):
         self._candidates = (self._candidates[: start] +
                             self._candidates[end:])
 
+    def insert_candidate(self, path: Path, index: int) -> bool:
+        """
+        Insert the new {path} candidate into the tree without re-listing.
+        Returns False if the change cannot be located.
+        """
+        if self.get_candidate_pos(path, index) >= 0:
+            # Already exists
+            return True
+
+        parent_pos = self._locate_parent(path, index)
+        if parent_pos == -1:
+            return False
+        if parent_pos == -2:
+            # Not visible
+            return True
+
+        defx = self._defxs[index]
+        parent = self._candidates[parent_pos]
+        level = 0 if parent['is_root'] else parent['level'] + 1
+        siblings = defx._gather_candidates(str(path.parent), level)
+        order = {x['action__path']: i for [i, x] in enumerate(siblings)}
+        if path not in order:
+            # Filtered or ignored
+            return True
+
+        candidate = siblings[order[path]]
+        candidate['_defx_index'] = index
+
+        pos = parent_pos + 1
+        for child in self._candidates[parent_pos + 1:]:
+            if (child['is_root'] or child['level'] < level or
+                    child['_defx_index'] != index):
+                break
+            if (child['level'] == level and
+                    order.get(child['action__path'], -1) > order[path]):
+                break
+            pos += 1
+
+        # Note: The new list is compared with the previous candidates to
+        # redraw the other views.
+        self._candidates = (self._candidates[: pos] + [candidate] +
+                            self._candidates[pos:])
+        defx.update_directory_stat(str(path.parent))
+        return True
+
+    def remove_candidate(self, path: Path, index: int) -> bool:
+        """
+        Remove {path} candidate and its subtree without re-listing.
+        Returns False if the change cannot be located.
+        """
+        defx = self._defxs[index]
+        pos = self.get_candidate_pos(path, index)
+        if pos < 0:
+            if defx._nested_candidates:
+                # It may be merged into the nested candidate
+                return False
+            return self._locate_parent(path, index) != -1
+
+        target = self._candidates[pos]
+        if target['is_root']:
+            return False
+
+        end = pos + 1
+        for candidate in self._candidates[pos + 1:]:
+            if candidate['is_root'] or candidate['level'] <= target['level']:
+                break
+            self._remove_nested_path(defx, candidate['action__path'])
+            end += 1
+        self._remove_nested_path(defx, path)
+
+        self._candidates = self._candidates[: pos] + self._candidates[end:]
+        defx.update_directory_stat(str(path.parent))
+        return True
+
+    def rename_candidate(self, old: Path, new: Path, index: int) -> bool:
+        """
+        Move {old} candidate to {new} without re-listing.
+        Returns False if the change cannot be located.
+        """
+        pos = self.get_candidate_pos(old, index)
+        is_opened = pos >= 0 and self._candidates[pos]['is_opened_tree']
+        if (not self.remove_candidate(old, index) or
+                not self.insert_candidate(new, index)):
+            return False
+        if is_opened:
+            self.open_tree(new, index, False)
+        return True
+
+    def update_tree(self, changes: typing.List[typing.Tuple[
+            typing.Optional[Path], typing.Optional[Path]]]) -> None:
+        """
+        Patch the tree by (old, new) changes instead of re-listing.
+        If the change cannot be located, redraw the all candidates.
+        """
+        self._clear_narrow()
+        for defx in self._defxs:
+            for [old, new] in changes:
+                patched = True
+                if old and new:
+                    patched = self.rename_candidate(old, new, defx._index)
+                elif old:
+                    patched = self.remove_candidate(old, defx._index)
+                elif new:
+                    patched = self.insert_candidate(new, defx._index)
+                if not patched:
+                    self.redraw(True)
+                    return
+
+        self.update_candidates()
+        self.redraw()
+
     def restore_previous_buffer(self, bufnr: int) -> None:
         if (not self._vim.call('buflisted', bufnr) or
                 self._vim.call('win_getid') != self._winid):
@@ -439,6 +857,84 @@ class View(object):
         if str(path) in defx._nested_candidates:
             defx._nested_candidates.remove(str(path))
 
+    def _locate_parent(self, path: Path, index: int) -> int:
+        """
+        Returns the parent candidate position of {path}.
+        -1 means the parent cannot be located.
+        -2 means {path} is not visible in the tree.
+        """
+        cwd = Path(self._defxs[index]._cwd)
+        if path.parent != cwd and cwd not in path.parent.parents:
+            return -2
+
+        parent = path.parent
+        while True:
+            pos = self.get_candidate_pos(parent, index)
+            if pos >= 0:
+                break
+            if parent == cwd:
+                return -1
+            parent = parent.parent
+
+        candidate = self._candidates[pos]
+        if parent != path.parent:
+            # The nearest ancestor must be closed
+            return -1 if candidate['is_opened_tree'] else -2
+        if not candidate['is_opened_tree'] and not candidate['is_root']:
+            return -2
+        return pos
+
+    def _revalidate_snapshot(self, snap: Snapshot) -> None:
+        """
+        Check the directories painted from the snapshot in the background.
+        """
+        if not hasattr(self._vim, 'async_call'):
+            self._refresh_directories(snap.changed())
+            return
+
+        def check() -> None:
+            changed = snap.changed()
+            if changed:
+                self._vim.async_call(self._refresh_directories, changed)
+
+        threading.Thread(target=check, daemon=True).start()
+
+    def refresh_changed_directories(self) -> None:
+        """
+        Gather the opened directories changed after the gathering again.
+        They are checked by one stat sweep.
+        """
+        opened = [(x['_defx_index'], str(x['action__path']))
+                  for x in self._candidates
+                  if x['is_opened_tree'] or x['is_root']]
+        if not opened:
+            return
+
+        with ThreadPoolExecutor(
+                max_workers=min(8, len(opened))) as executor:
+            stats = list(executor.map(directory_stat,
+                                      [x[1] for x in opened]))
+
+        changed = []
+        for defx in self._defxs:
+            changed += defx.changed_directories(
+                {x[1]: y for [x, y] in zip(opened, stats)
+                 if x[0] == defx._index})
+        self._refresh_directories(changed)
+
+    def _refresh_directories(self, paths: typing.List[str]) -> None:
+        if not paths or self._vim.call('bufwinnr', self._bufnr) < 0:
+            return
+
+        self._clear_narrow()
+        # Note: The parents are refreshed first.  The subtrees of the
+        # children are kept by the parents.
+        for path in [Path(x) for x in sorted(paths, key=len)]:
+            for defx in self._defxs:
+                self.refresh_directory(path, defx._index)
+        self.update_candidates()
+        self.redraw()
+
     def _init_context(
             self, context: typing.Dict[str, typing.Any]) -> Context:
         # Convert to int
@@ -467,13 +963,17 @@ class View(object):
             return
 
         # restore opened_candidates
+        # Note: The opened directories are gathered in parallel and the
+        # removed directories are skipped.
         session = self._sessions[path]
-        for opened_path in session.opened_candidates:
+        defx = self._defxs[index]
+        for opened_path in defx.prefetch(session.opened_candidates):
             self.open_tree(Path(opened_path), index, False)
+        defx._prefetched = {}
         self.update_candidates()
         self.redraw()
 
-    def _init_defx(self, clipboard: Clipboard) -> bool:
+    def _init_defx(self, clipboard: Clipboard, jobs: Jobs) -> bool:
         if not self._switch_buffer():
             return False
 
@@ -521,16 +1021,20 @@ class View(object):
                           'call defx#call_action("check_redraw")')
         self._vim.command('autocmd defx FileType <buffer> '
                           'call defx#call_action("redraw")')
+        self._vim.command('autocmd defx Syntax <buffer> '
+                          'let g:defx#_highlight_generation += 1')
 
-        self._prev_highlight_commands = []
+        self._highlight_key = (0, -1)
 
         # Initialize defx state
         self._candidates = []
         self._clipboard = clipboard
+        self._jobs = jobs
         self._defxs = []
 
-        self._init_all_sources()
-        self._init_all_columns()
+        # Note: The sources and columns are loaded when they are used
+        self._all_sources = {}
+        self._all_columns = {}
         self._init_columns(self._context.columns.split(':'))
 
         self._vim.vars['defx#_drives'] = self._context.drives
@@ -614,38 +1118,28 @@ class View(object):
                 self._bufname)
         return True
 
-    def _init_all_sources(self) -> None:
-        from defx.base.source import Base as Source
-        self._all_sources: typing.Dict[str, Source] = {}
-
-        for path_source in self._load_custom_sources():
-            source = import_plugin(path_source, 'source', 'Source')
+    def _get_source(self, name: str) -> typing.Any:
+        if name not in self._all_sources:
+            source = plugins().find(self._vim, 'source', name)
             if not source:
-                continue
-
-            source = source(self._vim)
-            if source.name not in self._all_sources:
-                self._all_sources[source.name] = source
+                return None
+            self._all_sources[name] = source
+        return self._all_sources[name]
 
-    def _init_all_columns(self) -> None:
-        from defx.base.column import Base as Column
-        self._all_columns: typing.Dict[str, Column] = {}
-
-        for path_column in self._load_custom_columns():
-            column = import_plugin(path_column, 'column', 'Column')
+    def _get_column(self, name: str) -> typing.Any:
+        if name not in self._all_columns:
+            column = plugins().find(self._vim, 'column', name)
             if not column:
-                continue
-
-            column = column(self._vim)
-            if column.name not in self._all_columns:
-                self._all_columns[column.name] = column
+                return None
+            self._all_columns[name] = column
+        return self._all_columns[name]
 
     def _init_columns(self, columns: typing.List[str]) -> None:
         from defx.base.column import Base as Column
         custom = self._vim.call('defx#custom#_get')['column']
         self._columns: typing.List[Column] = [
-            copy.copy(self._all_columns[x])
-            for x in columns if x in self._all_columns
+            copy.copy(self._get_column(x))
+            for x in columns if self._get_column(x)
         ]
         for column in self._columns:
             if column.name in custom:
@@ -701,37 +1195,32 @@ class View(object):
                 within_variable = False
 
     def _init_column_syntax(self) -> None:
-        commands: typing.List[str] = []
-
-        for syntax in self._prev_syntaxes:
-            commands.append(
-                'silent! syntax clear ' + syntax)
-
-        if self._proptypes:
-            self._clear_prop_types()
-
-        self._prev_syntaxes = []
+        highlight_commands: typing.List[str] = []
+        syntaxes: typing.List[str] = []
         for column in self._columns:
             source_highlights = column.highlight_commands()
             if not source_highlights:
                 continue
 
-            commands += source_highlights
-            self._prev_syntaxes += column.syntaxes()
+            highlight_commands += source_highlights
+            syntaxes += column.syntaxes()
 
-        syntax_list = commands + [
-            self._vim.call('execute', 'syntax list'),
-            self._vim.call('execute', 'highlight'),
-        ]
-        if syntax_list == self._prev_highlight_commands:
+        # Note: The highlight generation is increased by ColorScheme and
+        # Syntax autocmds.  The large "syntax list" and "highlight" outputs
+        # are not compared.
+        key = (hash(tuple(highlight_commands)),
+               self._vim.vars.get('defx#_highlight_generation', 0))
+        if key == self._highlight_key:
             # Skip highlights
             return
 
-        self._execute_commands(commands)
-        self._prev_highlight_commands = commands + [
-            self._vim.call('execute', 'syntax list'),
-            self._vim.call('execute', 'highlight'),
-        ]
+        commands = ['silent! syntax clear ' + x for x in self._prev_syntaxes]
+        if self._proptypes:
+            self._clear_prop_types()
+
+        self._execute_commands(commands + highlight_commands)
+        self._prev_syntaxes = syntaxes
+        self._highlight_key = key
 
     def _execute_commands(self, commands: typing.List[str]) -> None:
         # Note: If commands are too huge, vim.command() will fail.
@@ -742,20 +1231,56 @@ class View(object):
             cnt += threshold
 
     def _init_candidates(self) -> None:
+        clear_cache()
+        self._narrow_base = None
+        # Note: The root candidates call Vim in the main thread.
+        roots = [x.get_root_candidate() for x in self._defxs]
+
+        # Note: The other sources may call Vim in the threads.
+        if (len(self._defxs) <= 1 or
+                [x for x in self._defxs if x._source.name != 'file']):
+            self._candidates = []
+            for [defx, root] in zip(self._defxs, roots):
+                self._candidates += self._gather_section(defx, root)
+            return
+
+        # Note: The roots may be on the different mounts.  They are gathered
+        # in parallel and the ready sections are painted in the order.
         self._candidates = []
-        for defx in self._defxs:
-            root = defx.get_root_candidate()
-            root_path = root['action__path']
-            defx._mtime = (root_path.stat().st_mtime
-                           if readable(root_path) and root_path.is_dir()
-                           else -1)
-
-            candidates = [root]
-            candidates += defx.tree_candidates(
-                defx._cwd, 0, self._context.auto_recursive_level)
-            for candidate in candidates:
-                candidate['_defx_index'] = defx._index
-            self._candidates += candidates
+        with ThreadPoolExecutor(
+                max_workers=min(8, len(self._defxs))) as executor:
+            futures = [executor.submit(self._gather_section, x, y)
+                       for [x, y] in zip(self._defxs, roots)]
+            for future in futures:
+                self._candidates += future.result()
+                if not all([x.done() for x in futures]):
+                    self._paint_candidates()
+
+    def _gather_section(self, defx: Defx,
+                        root: Candidate) -> Candidates:
+        candidates = [root]
+        candidates += defx.tree_candidates(
+            defx._cwd, 0, self._context.auto_recursive_level)
+        for candidate in candidates:
+            candidate['_defx_index'] = defx._index
+        return candidates
+
+    def _paint_candidates(self) -> None:
+        """
+        Paint the gathered candidates without highlights until the
+        redraw is finished.
+        """
+        self._init_column_length()
+        for column in self._columns:
+            column.on_redraw(self, self._context)
+        lines = [self._get_columns_text(self._context, x)[0]
+                 for x in self._candidates]
+
+        self._buffer.options['modifiable'] = True
+        self._buffer[:] = lines
+        self._buffer.options['modifiable'] = False
+        self._buffer.options['modified'] = False
+        self._vim.command('redraw')
 
     def _get_columns_text(self, context: Context, candidate: Candidate
                           ) -> typing.Tuple[str, Highlights]:
@@ -802,10 +1327,8 @@ class View(object):
         self._buffer.vars['defx'] = var_defx
 
     def _init_cursor(self, defx: Defx) -> None:
-        self.search_file(Path(defx._cwd), defx._index)
-
         # Move to next
-        self._vim.call('cursor', [self._vim.call('line', '.') + 1, 1])
+        self._search_file(Path(defx._cwd), defx._index, 1)
 
     def _get_wininfo(self) -> typing.List[str]:
         return [
@@ -813,37 +1336,19 @@ class View(object):
             self._vim.call('win_getid'), self._vim.call('tabpagebuflist')
         ]
 
-    def _load_custom_sources(self) -> typing.List[Path]:
-        result = []
-        result += self._vim.call('globpath',
-                                 self._vim.options['runtimepath'],
-                                 'rplugin/python3/defx/source/*.py', 1, 1)
-        result += self._vim.call('globpath',
-                                 self._vim.options['runtimepath'],
-                                 'rplugin/python3/defx/source/*/*.py', 1, 1)
-        return [Path(x) for x in result]
-
-    def _load_custom_columns(self) -> typing.List[Path]:
-        result = []
-        result += self._vim.call('globpath',
-                                 self._vim.options['runtimepath'],
-                                 'rplugin/python3/defx/column/*.py', 1, 1)
-        return [Path(x) for x in result]
-
     def _update_defx_paths(self,
                            paths: typing.List[typing.List[str]]) -> None:
         self._defxs = self._defxs[:len(paths)]
 
         for [index, [source_name, path]] in enumerate(paths):
-            if source_name not in self._all_sources:
+            source = self._get_source(source_name)
+            if not source:
                 error(self._vim, 'Invalid source_name:' + source_name)
                 return
 
             if index >= len(self._defxs):
                 self._defxs.append(
-                    Defx(self._vim, self._context,
-                         self._all_sources[source_name],
-                         path, index))
+                    Defx(self._vim, self._context, source, path, index))
             else:
                 defx = self._defxs[index]
                 self.cd(defx, defx._source.name, path, self._context.cursor)
@@ -0,0 +1,85 @@
+"""
+Compare the copy throughput of defx.transfer.copy_file() with
+shutil.copy2() which was used by the paste action.
+
+    python test/benchmark/bench_copy.py --size 4G --dir /mnt/target
+    python test/benchmark/bench_copy.py --size 4G --sparse
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import typing
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.joinpath(
+    'rplugin/python3')))
+
+from defx.transfer import copy_file, format_size  # noqa: E402
+
+
+def parse_size(size: str) -> int:
+    units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+    if size[-1].upper() in units:
+        return int(float(size[:-1]) * units[size[-1].upper()])
+    return int(size)
+
+
+def make_file(path: Path, size: int, sparse: bool) -> None:
+    chunk = os.urandom(1024 * 1024)
+    with path.open('wb') as f:
+        if sparse:
+            # 1MB data per 64MB
+            for offset in range(0, size, 64 * len(chunk)):
+                f.seek(offset)
+                f.write(chunk[: min(len(chunk), size - offset)])
+            f.truncate(size)
+        else:
+            for _ in range(size // len(chunk)):
+                f.write(chunk)
+            f.write(chunk[: size % len(chunk)])
+
+
+def measure(name: str, size: int,
+            func: typing.Callable[[], None]) -> None:
+    start = time.time()
+    func()
+    elapsed = time.time() - start
+    print(f'{name:<12} {elapsed:8.3f}s {format_size(size / elapsed)}/s')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size', default='2G')
+    parser.add_argument('--dir', default='',
+                        help='destination directory(another disk)')
+    parser.add_argument('--sparse', action='store_true')
+    parser.add_argument('--chunk-size', default='1M')
+    args = parser.parse_args()
+
+    size = parse_size(args.size)
+    chunk_size = parse_size(args.chunk_size)
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp).joinpath('src')
+        dest_dir = Path(args.dir) if args.dir else Path(tmp)
+        make_file(src, size, args.sparse)
+        print(f'size: {format_size(size)} sparse: {args.sparse}')
+
+        dest = dest_dir.joinpath('defx_bench_shutil')
+        measure('shutil.copy2', size,
+                lambda: shutil.copy2(str(src), str(dest)))
+        dest.unlink()
+
+        dest = dest_dir.joinpath('defx_bench_defx')
+        measure('copy_file', size,
+                lambda: copy_file(src, dest, chunk_size,
+                                  lambda x: None, lambda: False))
+        print(f'allocated: {format_size(dest.stat().st_blocks * 512)}')
+        dest.unlink()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Measure the import time of the defx modules and the plugin loading.
+Every module is imported in a new interpreter.
+
+    python test/benchmark/bench_import.py
+    python test/benchmark/bench_import.py --repeat 20 --columns mark:filename
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+import typing
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent.parent.joinpath('rplugin/python3')
+sys.path.insert(0, str(BASE_DIR))
+
+from defx.plugins import guess_name  # noqa: E402
+from defx.util import import_plugin  # noqa: E402
+
+MODULES = ['defx', 'defx.view', 'defx.kind.filelike']
+
+
+def import_time(module: str) -> float:
+    code = ('import sys, time; sys.path.insert(0, sys.argv[1]); '
+            'start = time.perf_counter(); '
+            f'import {module}; '
+            'print(time.perf_counter() - start)')
+    output = subprocess.check_output(
+        [sys.executable, '-c', code, str(BASE_DIR)],
+        universal_newlines=True)
+    return float(output)
+
+
+def load_time(paths: typing.List[Path]) -> float:
+    start = time.perf_counter()
+    for path in paths:
+        import_plugin(path, 'column', 'Column')
+    return time.perf_counter() - start
+
+
+def report(name: str, times: typing.List[float]) -> None:
+    print(f'{name:<24} min {min(times) * 1000:8.2f}ms '
+          f'median {statistics.median(times) * 1000:8.2f}ms')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--columns', default='mark:indent:icon:filename:type',
+                        help='the columns loaded by the lazy loading')
+    args = parser.parse_args()
+
+    for module in MODULES:
+        report(module, [import_time(module) for _ in range(args.repeat)])
+
+    all_columns = sorted(BASE_DIR.joinpath('defx', 'column').glob('*.py'))
+    columns = [x for x in all_columns
+               if guess_name(x, 'column') in args.columns.split(':')]
+    report(f'all columns ({len(all_columns)})',
+           [load_time(all_columns) for _ in range(args.repeat)])
+    report(f'used columns ({len(columns)})',
+           [load_time(columns) for _ in range(args.repeat)])
+
+
+if __name__ == '__main__':
+    main()
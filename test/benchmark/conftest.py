@@ -0,0 +1,110 @@
+import json
+import time
+import tracemalloc
+import typing
+from pathlib import Path
+
+import pytest
+
+from synthetic import make_tree, parse_size
+
+# name, seconds, peak memory bytes
+Result = typing.Tuple[str, float, int]
+
+_results: typing.List[Result] = []
+
+
+class Benchmark(object):
+    """
+    Measure the best time of {rounds} runs and the peak memory of one
+    run by tracemalloc.
+    """
+
+    def __init__(self, name: str, baseline: typing.Dict[str, float],
+                 tolerance: float) -> None:
+        self.name = name
+        self._baseline = baseline
+        self._tolerance = tolerance
+
+    def __call__(self, func: typing.Callable[[], typing.Any],
+                 rounds: int = 3,
+                 setup: typing.Optional[typing.Callable[[], None]] = None
+                 ) -> typing.Any:
+        elapsed = float('inf')
+        result = None
+        for _ in range(rounds):
+            if setup:
+                setup()
+            start = time.perf_counter()
+            result = func()
+            elapsed = min(elapsed, time.perf_counter() - start)
+
+        if setup:
+            setup()
+        tracemalloc.start()
+        try:
+            func()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        _results.append((self.name, elapsed, peak))
+        baseline = self._baseline.get(self.name, 0)
+        if baseline and elapsed > baseline * self._tolerance:
+            pytest.fail(f'{self.name}: {elapsed:.4f}s is slower than '
+                        f'the baseline {baseline:.4f}s')
+        return result
+
+
+@pytest.fixture
+def defx_benchmark(request: typing.Any) -> Benchmark:
+    config = request.config
+    baseline: typing.Dict[str, float] = {}
+    compare = config.getoption('--defx-bench-compare')
+    if compare:
+        baseline = {x['name']: x['time'] for x in json.loads(
+            Path(compare).read_text())['benchmarks']}
+    return Benchmark(request.node.name, baseline,
+                     config.getoption('--defx-bench-tolerance'))
+
+
+@pytest.fixture(scope='session')
+def tree(tmp_path_factory: typing.Any,
+         pytestconfig: typing.Any) -> typing.Tuple[Path, typing.List[Path]]:
+    """
+    Returns the root and the directories of the synthetic tree.
+    """
+    root = tmp_path_factory.mktemp('tree')
+    directories = make_tree(
+        root, parse_size(pytestconfig.getoption('--defx-bench-size')),
+        pytestconfig.getoption('--defx-bench-depth'),
+        pytestconfig.getoption('--defx-bench-names'))
+    return (root, directories)
+
+
+def pytest_terminal_summary(terminalreporter: typing.Any,
+                            config: typing.Any) -> None:
+    # Note: The plain "pytest" runs the benchmarks as the tests quietly.
+    if not _results or not (config.getoption('--defx-bench') or
+                            config.getoption('--defx-bench-save') or
+                            config.getoption('--defx-bench-compare')):
+        return
+
+    terminalreporter.section('defx benchmark')
+    terminalreporter.write_line('size: {} depth: {} names: {}'.format(
+        config.getoption('--defx-bench-size'),
+        config.getoption('--defx-bench-depth'),
+        config.getoption('--defx-bench-names')))
+    terminalreporter.write_line(
+        '{:<40} {:>12} {:>12}'.format('name', 'time(ms)', 'peak(KB)'))
+    for [name, elapsed, peak] in _results:
+        terminalreporter.write_line('{:<40} {:>12.3f} {:>12.1f}'.format(
+            name, elapsed * 1000, peak / 1024))
+
+    save = config.getoption('--defx-bench-save')
+    if save:
+        Path(save).write_text(json.dumps({
+            'size': config.getoption('--defx-bench-size'),
+            'benchmarks': [{'name': x[0], 'time': x[1], 'peak': x[2]}
+                           for x in _results],
+        }, indent=2))
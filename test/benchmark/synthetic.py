@@ -0,0 +1,82 @@
+"""
+Generate the synthetic directory trees for the benchmarks.
+"""
+
+import math
+import random
+import typing
+from pathlib import Path
+
+SIZES = {'1k': 1000, '100k': 100000, '1M': 1000000}
+
+EXTENSIONS = ['py', 'txt', 'md', 'c', 'h', 'json', 'png', 'tar.gz', 'vim', '']
+
+
+def parse_size(size: str) -> int:
+    return SIZES[size] if size in SIZES else int(size)
+
+
+def make_name(rng: random.Random, names: str, index: int,
+              is_directory: bool) -> str:
+    kind = names
+    if names == 'mixed':
+        kind = rng.choice(['ascii', 'ascii', 'ascii', 'numbered',
+                           'unicode', 'long'])
+
+    if kind == 'numbered':
+        # For the natural sort
+        base = f'file{index}'
+    elif kind == 'unicode':
+        base = ''.join([rng.choice('あいうえおカキクケコ漢字éü')
+                        for _ in range(rng.randint(2, 8))]) + str(index)
+    elif kind == 'long':
+        base = '_'.join([rng.choice(['alpha', 'Beta', 'gamma', 'DELTA'])
+                         for _ in range(rng.randint(8, 16))]) + str(index)
+    else:
+        base = ''.join([rng.choice('abcdefghijklmnopqrstuvwxyzABC_-')
+                        for _ in range(rng.randint(3, 12))]) + str(index)
+
+    if names == 'mixed' and rng.random() < 0.05:
+        base = '.' + base
+    if is_directory:
+        return base
+    ext = rng.choice(EXTENSIONS)
+    return f'{base}.{ext}' if ext else base
+
+
+def make_tree(root: Path, entries: int, depth: int,
+              names: str = 'mixed', seed: int = 0) -> typing.List[Path]:
+    """
+    Create about {entries} files and directories in {root}.  Every
+    directory has the same number of subdirectories until {depth}.
+    Returns the created directories.
+    """
+    rng = random.Random(seed)
+    depth = max(depth, 1)
+    fanout = max(1, round(entries ** (1 / (depth + 1))))
+    levels = [fanout ** x for x in range(1, depth + 1)]
+    directories = sum(levels)
+    files = max(0, entries - directories)
+    files_per_dir = math.ceil(files / (directories + 1))
+
+    created = [root]
+    parents = [root]
+    count = 0
+    for _ in range(depth):
+        children = []
+        for parent in parents:
+            for _ in range(fanout):
+                path = parent.joinpath(make_name(rng, names, count, True))
+                path.mkdir(parents=True)
+                children.append(path)
+                count += 1
+        created += children
+        parents = children
+
+    for directory in created:
+        for _ in range(min(files_per_dir, files)):
+            directory.joinpath(
+                make_name(rng, names, count, False)).touch()
+            count += 1
+            files -= 1
+    return created
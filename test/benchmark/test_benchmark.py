@@ -0,0 +1,88 @@
+"""
+The benchmarks of the hot paths with the synthetic trees.
+
+    pytest test/benchmark --defx-bench
+    pytest test/benchmark --defx-bench --defx-bench-size 100k
+    pytest test/benchmark --defx-bench-save before.json
+    pytest test/benchmark --defx-bench-compare before.json
+"""
+
+import typing
+from pathlib import Path
+
+import pytest
+
+from defx.clipboard import Clipboard
+from defx.context import Context
+from defx.job import Jobs
+from defx.sort import sort
+from defx.view import View
+
+COLUMNS = 'mark:indent:icon:filename:type:size:time'
+
+
+@pytest.fixture
+def view(fake_nvim: typing.Any,
+         tree: typing.Tuple[Path, typing.List[Path]]) -> View:
+    [root, directories] = tree
+    view = View(fake_nvim, 0)
+    context = Context()._asdict()
+    context.update(columns=COLUMNS, sort='filename',
+                   ignored_files='.*', winwidth=120)
+    view.init_paths([['file', str(root)]], context, Clipboard(), Jobs())
+
+    # Open all directories
+    view._defxs[0]._opened_candidates = set([str(x) for x in directories])
+    view.redraw(True)
+    return view
+
+
+def test_tree_candidates(defx_benchmark: typing.Any, view: View) -> None:
+    defx = view._defxs[0]
+    candidates = defx_benchmark(
+        lambda: defx.tree_candidates(defx._cwd, 0, 0))
+    assert len(candidates) == len(view._candidates) - 1
+
+
+@pytest.mark.parametrize('method', ['filename', 'extension', 'size', 'time'])
+def test_sort(defx_benchmark: typing.Any, view: View,
+              method: str) -> None:
+    candidates = view._candidates[1:]
+    assert len(defx_benchmark(
+        lambda: sort(method, list(candidates)))) == len(candidates)
+
+
+def test_redraw(defx_benchmark: typing.Any, view: View) -> None:
+    defx_benchmark(lambda: view.redraw())
+    assert len(view._vim.current.buffer) == len(view._candidates)
+
+
+def test_redraw_force(defx_benchmark: typing.Any, view: View) -> None:
+    defx_benchmark(lambda: view.redraw(True))
+    assert len(view._vim.current.buffer) == len(view._candidates)
+
+
+@pytest.mark.parametrize('name', COLUMNS.split(':'))
+def test_column(defx_benchmark: typing.Any, view: View,
+                name: str) -> None:
+    [column] = [x for x in view._columns if x.name == name]
+    context = view._context
+
+    def get() -> None:
+        column.on_redraw(view, context)
+        for candidate in view._candidates:
+            if column.is_stop_variable:
+                column.get_with_variable_text(context, '', candidate)
+            elif column.has_get_with_highlights:
+                column.get_with_highlights(context, candidate)
+            else:
+                column.get(context, candidate)
+    defx_benchmark(get)
+
+
+def test_toggle_select_all(defx_benchmark: typing.Any,
+                           view: View) -> None:
+    new_context = {'cursor': 1, 'visual_start': 0, 'visual_end': 0}
+    defx_benchmark(
+        lambda: view.do_action('toggle_select_all', [], new_context),
+        rounds=2)
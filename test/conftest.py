@@ -1,7 +1,144 @@
 import sys
+import typing
+import unicodedata
 
+from collections import Counter
 from pathlib import Path
+from unittest.mock import MagicMock
 
+import pytest
 
 BASE_DIR = Path(__file__).parent.parent
 sys.path.insert(0, str(BASE_DIR.joinpath('rplugin/python3')))
+
+
+def pytest_addoption(parser: typing.Any) -> None:
+    group = parser.getgroup('defx benchmark')
+    group.addoption('--defx-bench', action='store_true',
+                    help='print the benchmark results')
+    group.addoption('--defx-bench-size', default='1k',
+                    help='the entries of the synthetic trees: '
+                    '"1k", "100k", "1M" or the number')
+    group.addoption('--defx-bench-depth', type=int, default=3,
+                    help='the depth of the synthetic trees')
+    group.addoption('--defx-bench-names', default='mixed',
+                    help='the names distribution of the synthetic trees: '
+                    '"mixed", "ascii", "numbered", "unicode" or "long"')
+    group.addoption('--defx-bench-save', default='',
+                    help='save the benchmark results to the JSON file')
+    group.addoption('--defx-bench-compare', default='',
+                    help='fail if the benchmark is slower than the results '
+                    'of the JSON file')
+    group.addoption('--defx-bench-tolerance', type=float, default=1.5,
+                    help='the allowed ratio for --defx-bench-compare')
+
+
+def strwidth(word: str) -> int:
+    return sum([2 if unicodedata.east_asian_width(x) in 'WF' else 1
+                for x in word])
+
+
+def truncate_skipping(word: str, max_width: int,
+                      footer_width: int, separator: str) -> str:
+    if strwidth(word) <= max_width:
+        return word
+    header = word[: max(0, max_width - len(separator) - footer_width)]
+    footer = word[len(word) - footer_width:] if footer_width else ''
+    return (header + separator + footer)[: max_width]
+
+
+class FakeBuffer(list):  # type: ignore
+    """
+    The buffer lines and the variables.  It compares by identity like
+    pynvim.api.Buffer.
+    """
+
+    def __init__(self, number: int) -> None:
+        super().__init__([''])
+        self.number = number
+        self.name = ''
+        self.vars: typing.Dict[str, typing.Any] = {}
+        self.options: typing.Dict[str, typing.Any] = {
+            'modified': False, 'modifiable': True,
+        }
+
+    def append(self, lines: typing.Any) -> None:
+        if isinstance(lines, list):
+            self.extend(lines)
+        else:
+            super().append(lines)
+
+    def __eq__(self, other: object) -> bool:
+        return self is other
+
+    def __hash__(self) -> int:
+        return id(self)
+
+
+class FakeNvim(object):
+    """
+    The in-process Nvim host for the tests and the benchmarks.
+
+    The functions are implemented by {functions} or return 0.  The
+    requests are counted in {calls}.
+    """
+
+    def __init__(self, cwd: str = '/') -> None:
+        self.channel_id = 0
+        self.vars: typing.Dict[str, typing.Any] = {
+            'defx#_histories': [],
+        }
+        self.options: typing.Dict[str, typing.Any] = {
+            'hidden': True, 'runtimepath': str(BASE_DIR),
+            'columns': 80, 'lines': 24,
+        }
+        self.current = MagicMock()
+        self.current.buffer = FakeBuffer(1)
+        self.calls: typing.Counter[str] = Counter()
+        self.commands: typing.List[str] = []
+
+        self.functions: typing.Dict[str, typing.Callable[..., typing.Any]] = {
+            'getcwd': lambda: cwd,
+            'fnamemodify': lambda x, y: x,
+            'defx#custom#_get': lambda: {
+                'column': {}, 'option': {}, 'source': {}},
+            'defx#util#is_windows': lambda: False,
+            'defx#util#has_textprop': lambda: False,
+            'nvim_create_namespace': lambda x: 1,
+            'getbufinfo': lambda x: [{'lnum': 1}],
+            'winsaveview': lambda: {},
+            'win_getid': lambda: 1000,
+            'bufnr': lambda x: self.current.buffer.number,
+            'bufwinnr': lambda x: 1,
+            'bufloaded': lambda x: True,
+            'line': lambda x: 1,
+            'has': lambda x: x == 'nvim',
+            'execute': lambda x: '',
+            'strwidth': strwidth,
+            'map': lambda x, y: [strwidth(z) for z in x]
+            if y == 'strwidth(v:val)' else x,
+            'defx#util#truncate_skipping': truncate_skipping,
+            'globpath': self._globpath,
+        }
+
+    def call(self, name: str, *args: typing.Any) -> typing.Any:
+        self.calls[name] += 1
+        func = self.functions.get(name, None)
+        return func(*args) if func else 0
+
+    def command(self, command: str) -> None:
+        self.calls['command'] += 1
+        self.commands.append(command)
+
+    def async_call(self, func: typing.Callable[..., typing.Any],
+                   *args: typing.Any) -> None:
+        func(*args)
+
+    def _globpath(self, path: str, pattern: str,
+                  nosuf: int, is_list: int) -> typing.List[str]:
+        return [str(x) for x in sorted(Path(path).glob(pattern))]
+
+
+@pytest.fixture
+def fake_nvim() -> FakeNvim:
+    return FakeNvim()
@@ -0,0 +1,75 @@
+from defx.clipboard import Clipboard
+from defx.context import Context
+from defx.executor import ActionExecutor, Request
+from defx.job import Jobs
+from defx.rplugin import Rplugin
+from defx.util import CancelToken
+from defx.view import View
+
+
+class Vim(object):
+    # The host without async_call()
+    pass
+
+
+def test_reentrant_order():
+    order = []
+
+    def do_action(view, args):
+        order.append(('start', args[0]))
+        if args[0] == 'first':
+            # The next request is handled while the action waits for Vim
+            executor.submit(view, ['second', [], {'cursor': 1}])
+        order.append(('end', args[0]))
+
+    executor = ActionExecutor(Vim(), do_action)
+    view = View(Vim(), 0)
+    executor.submit(view, ['first', [], {'cursor': 1}])
+    assert order == [('start', 'first'), ('end', 'first'),
+                     ('start', 'second'), ('end', 'second')]
+
+
+class CountToken(CancelToken):
+    # Cancelled after the checks
+    def __init__(self, count):
+        super().__init__()
+        self.count = count
+
+    def is_cancelled(self):
+        self.count -= 1
+        return self.count < 0
+
+
+def test_cancel_gather(tmp_path, fake_nvim):
+    for i in range(100):
+        tmp_path.joinpath(str(i)).touch()
+    view = View(fake_nvim, 0)
+    context = Context()._asdict()
+    context.update(columns='filename')
+    view.init_paths([['file', str(tmp_path)]], context, Clipboard(), Jobs())
+    defx = view._defxs[0]
+
+    # It is cancelled while listing the entries
+    token = CountToken(10)
+    assert defx.list_directories([str(tmp_path)], token=token) == {}
+    assert token.count < 0 and token.count > -10
+
+    gathered = defx.list_directories([str(tmp_path)], token=CancelToken())
+    assert len(gathered[str(tmp_path)]) == 100
+
+
+def test_cancel_quit(tmp_path, fake_nvim):
+    rplugin = Rplugin(fake_nvim)
+    view = rplugin.get_view({'buffer_name': 'default', 'new': False})
+    context = Context()._asdict()
+    context.update(columns='filename')
+    view.init_paths([['file', str(tmp_path)]], context, Clipboard(), Jobs())
+    view._bufnr = fake_nvim.current.buffer.number
+    fake_nvim.vars['defx#_previewed_buffers'] = {}
+
+    request = Request(view, ['cd', [], {}])
+    rplugin._executor._requests[view] = [request]
+    rplugin._do_action(view, ['quit', [], {
+        'cursor': 1, 'visual_start': 0, 'visual_end': 0}])
+    assert request.token.is_cancelled()
+    assert view not in rplugin._executor._requests
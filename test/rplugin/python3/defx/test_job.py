@@ -0,0 +1,29 @@
+import threading
+from pathlib import Path
+
+from defx.job import Job, Jobs
+
+
+def test_overlapped_jobs():
+    jobs = Jobs(workers=2)
+    started = []
+    release = threading.Event()
+
+    def first(job):
+        started.append('first')
+        release.wait(5)
+
+    def func(name):
+        return lambda job: started.append(name)
+
+    a = jobs.start(Job('move', 'a', first, [Path('/tmp/x')]))
+    b = jobs.start(Job('remove', 'b', func('b'), [Path('/tmp/x/y')]))
+    c = jobs.start(Job('copy', 'c', func('c'), [Path('/tmp/z')]))
+
+    # The unrelated job is not blocked
+    assert c.wait(5)
+    assert not b.wait(0.1)
+
+    release.set()
+    assert a.wait(5) and b.wait(5)
+    assert started.index('first') < started.index('b')
@@ -0,0 +1,29 @@
+from defx.rename import execute, plan
+
+
+def test_plan_chain(tmp_path):
+    [a, b, c] = [tmp_path.joinpath(x) for x in 'abc']
+    assert plan([(a, b), (b, c)]) == [(b, c), (a, b)]
+
+
+def test_plan_cycle(tmp_path):
+    [a, b] = [tmp_path.joinpath(x) for x in 'ab']
+    steps = plan([(a, b), (b, a)])
+    assert len(steps) == 3
+    temp = steps[0][1]
+    assert steps == [(a, temp), (b, a), (temp, b)]
+
+
+def test_execute(tmp_path):
+    [a, b, c, d] = [tmp_path.joinpath(x) for x in 'abcd']
+    a.write_text('a')
+    b.write_text('b')
+    c.write_text('c')
+    d.write_text('d')
+    [done, errors] = execute([(a, b), (b, a), (c, d)])
+    assert sorted(done) == [(a, b), (b, a)]
+    assert len(errors) == 1
+    assert a.read_text() == 'b'
+    assert b.read_text() == 'a'
+    assert c.read_text() == 'c'
+    assert sorted([x.name for x in tmp_path.iterdir()]) == list('abcd')
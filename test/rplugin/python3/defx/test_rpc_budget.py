@@ -0,0 +1,65 @@
+import pytest
+
+from defx.clipboard import Clipboard
+from defx.context import Context
+from defx.job import Jobs
+from defx.stats import rpc_stats
+from defx.view import View
+
+# The maximum RPC requests of the actions
+BUDGETS = {
+    'toggle_select': 5,
+    'toggle_select_all': 5,
+    'clear_select_all': 5,
+    'toggle_sort': 5,
+    'close_tree': 5,
+    'open_tree': 5,
+    'redraw': 7,
+    'check_redraw': 0,
+}
+
+
+def make_tree(root, entries):
+    directories = [root.joinpath(f'dir{x}') for x in range(3)]
+    for directory in directories:
+        directory.mkdir()
+        for i in range(entries):
+            name = f'file{i}.txt' if i % 3 else f'ファイル{i}.txt'
+            directory.joinpath(name).touch()
+    return directories
+
+
+def run_actions(root, directories, fake_nvim):
+    stats = rpc_stats()
+    stats.hook(fake_nvim)
+    stats.clear()
+
+    view = View(fake_nvim, 0)
+    context = Context()._asdict()
+    context.update(columns='mark:indent:icon:filename:type:size:time',
+                   sort='filename', winwidth=100)
+    view.init_paths([['file', str(root)]], context, Clipboard(), Jobs())
+    view._defxs[0]._opened_candidates = set([str(x) for x in directories])
+    view.redraw(True)
+
+    # The cursor is on the first directory
+    new_context = {'cursor': 2, 'visual_start': 0, 'visual_end': 0}
+    for action in BUDGETS:
+        args = ['time'] if action == 'toggle_sort' else []
+        view.do_action(action, args, new_context)
+    return {x: stats.total(x) for x in BUDGETS}
+
+
+@pytest.mark.parametrize('action', BUDGETS.keys())
+def test_rpc_budget(tmp_path, fake_nvim, action):
+    small = tmp_path.joinpath('small')
+    large = tmp_path.joinpath('large')
+    small.mkdir()
+    large.mkdir()
+    small_counts = run_actions(small, make_tree(small, 5), fake_nvim)
+    large_counts = run_actions(large, make_tree(large, 300),
+                               type(fake_nvim)())
+
+    assert small_counts[action] <= BUDGETS[action]
+    # It must not depend on the tree size
+    assert large_counts[action] == small_counts[action]
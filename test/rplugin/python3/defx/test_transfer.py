@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+from defx.transfer import Transfer, copy_file, copy_range
+
+
+def test_copy_file_cancelled(tmp_path):
+    src = tmp_path.joinpath('src')
+    dest = tmp_path.joinpath('dest')
+    src.write_bytes(os.urandom(1024 * 64))
+
+    copied = []
+    assert not copy_file(src, dest, 1024, copied.append,
+                         lambda: bool(copied))
+    assert not dest.exists()
+
+
+def test_transfer_special_file(tmp_path):
+    src = tmp_path.joinpath('src')
+    src.mkdir()
+    src.joinpath('file').write_text('foo')
+    os.mkfifo(str(src.joinpath('fifo')))
+
+    transfer = Transfer([(src, tmp_path.joinpath('dest'))])
+    transfer.run()
+    assert transfer.files_done == 1
+    assert len(transfer.errors) == 1
+    assert tmp_path.joinpath('dest', 'file').read_text() == 'foo'
+    assert not tmp_path.joinpath('dest', 'fifo').exists()
+
+
+def test_copy_range_fallback(tmp_path, monkeypatch):
+    src = tmp_path.joinpath('src')
+    dest = tmp_path.joinpath('dest')
+    data = os.urandom(1024 * 64)
+    src.write_bytes(data)
+
+    # The filesystem returns 0 instead of the error
+    monkeypatch.setattr(os, 'copy_file_range',
+                        lambda *args: 0, raising=False)
+    monkeypatch.setattr(os, 'sendfile', lambda *args: 0, raising=False)
+    with src.open('rb') as fsrc, dest.open('wb') as fdest:
+        copy_range(fsrc.fileno(), fdest.fileno(), 0, len(data),
+                   1024, lambda x: None, lambda: False)
+    assert dest.read_bytes() == data
+
+
+def test_copy_range_short(tmp_path):
+    src = tmp_path.joinpath('src')
+    dest = tmp_path.joinpath('dest')
+    src.write_bytes(b'foo')
+
+    with src.open('rb') as fsrc, dest.open('wb') as fdest:
+        with pytest.raises(OSError):
+            copy_range(fsrc.fileno(), fdest.fileno(), 0, 10,
+                       1024, lambda x: None, lambda: False)
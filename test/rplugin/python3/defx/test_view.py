@@ -0,0 +1,253 @@
+from defx.clipboard import Clipboard
+from defx.context import Context
+from defx.job import Jobs
+from defx.kind.file import Kind
+from defx.rplugin import Rplugin
+from defx.view import View
+
+
+def test_narrow_while_input(tmp_path, fake_nvim):
+    for name in ['foo', 'bar', 'baz']:
+        tmp_path.joinpath(name).touch()
+
+    view = View(fake_nvim, 0)
+    context = Context()._asdict()
+    context.update(columns='filename', sort='filename')
+    view.init_paths([['file', str(tmp_path)]], context, Clipboard(), Jobs())
+    new_context = {'cursor': 1, 'visual_start': 0, 'visual_end': 0}
+
+    painted = []
+
+    def narrow_input(prompt):
+        # CmdlineChanged calls the nested narrow action
+        view.do_action('narrow', ['ba'], new_context)
+        painted.append(list(fake_nvim.current.buffer))
+        return 'ba'
+    fake_nvim.functions['defx#util#narrow_input'] = narrow_input
+
+    view.do_action('narrow', [], new_context)
+    assert len(painted[0]) == 3
+    assert [x.strip() for x in painted[0][1:]] == ['bar', 'baz']
+
+
+def test_invalid_source(tmp_path, fake_nvim):
+    view = View(fake_nvim, 0)
+    context = Context()._asdict()
+    context.update(columns='filename')
+    view.init_paths([['nosuchsource', str(tmp_path)]], context,
+                    Clipboard(), Jobs())
+    assert view._candidates == []
+
+
+def _init_view(tmp_path, fake_nvim):
+    view = View(fake_nvim, 0)
+    context = Context()._asdict()
+    context.update(columns='filename', sort='filename', ignored_files='.*')
+    view.init_paths([['file', str(tmp_path)]], context, Clipboard(), Jobs())
+    return view
+
+
+def _paths(view, root):
+    return [str(x['action__path'].relative_to(root))
+            for x in view._candidates[1:]]
+
+
+def test_insert_candidate(tmp_path, fake_nvim):
+    for name in ['a', 'c']:
+        tmp_path.joinpath(name).touch()
+    tmp_path.joinpath('dir').mkdir()
+    tmp_path.joinpath('closed').mkdir()
+    view = _init_view(tmp_path, fake_nvim)
+    view.open_tree(tmp_path.joinpath('dir'), 0, False)
+    prev_candidates = view._candidates
+
+    # Sorted position
+    tmp_path.joinpath('b').touch()
+    assert view.insert_candidate(tmp_path.joinpath('b'), 0)
+    assert _paths(view, tmp_path) == ['closed', 'dir', 'a', 'b', 'c']
+    assert view._candidates != prev_candidates
+
+    # In the opened directory
+    tmp_path.joinpath('dir/x').touch()
+    assert view.insert_candidate(tmp_path.joinpath('dir/x'), 0)
+    assert _paths(view, tmp_path) == [
+        'closed', 'dir', 'dir/x', 'a', 'b', 'c']
+    pos = view.get_candidate_pos(tmp_path.joinpath('dir/x'), 0)
+    assert view._candidates[pos]['level'] == 1
+    assert view._candidates[pos]['_defx_index'] == 0
+
+    # Hidden files and the closed directories are not shown
+    prev = list(view._candidates)
+    tmp_path.joinpath('.hidden').touch()
+    tmp_path.joinpath('closed/y').touch()
+    assert view.insert_candidate(tmp_path.joinpath('.hidden'), 0)
+    assert view.insert_candidate(tmp_path.joinpath('closed/y'), 0)
+    assert view._candidates == prev
+
+    # The unopened directory cannot be located
+    tmp_path.joinpath('closed/sub').mkdir()
+    tmp_path.joinpath('closed/sub/z').touch()
+    view.open_tree(tmp_path.joinpath('closed'), 0, False)
+    assert view.insert_candidate(tmp_path.joinpath('closed/sub/z'), 0)
+    assert 'closed/sub/z' not in _paths(view, tmp_path)
+
+
+def test_remove_candidate(tmp_path, fake_nvim):
+    tmp_path.joinpath('dir').mkdir()
+    tmp_path.joinpath('dir/x').touch()
+    tmp_path.joinpath('a').touch()
+    view = _init_view(tmp_path, fake_nvim)
+    view.open_tree(tmp_path.joinpath('dir'), 0, False)
+    prev_candidates = view._candidates
+
+    assert view.remove_candidate(tmp_path.joinpath('dir'), 0)
+    assert _paths(view, tmp_path) == ['a']
+    assert view._candidates != prev_candidates
+    assert view.get_candidate_pos(tmp_path.joinpath('a'), 0) == 1
+
+    # The root cannot be removed
+    assert not view.remove_candidate(tmp_path, 0)
+
+
+def test_rename_candidate(tmp_path, fake_nvim):
+    tmp_path.joinpath('dir').mkdir()
+    tmp_path.joinpath('dir/x').touch()
+    tmp_path.joinpath('b').touch()
+    view = _init_view(tmp_path, fake_nvim)
+    view.open_tree(tmp_path.joinpath('dir'), 0, False)
+
+    tmp_path.joinpath('dir').rename(tmp_path.joinpath('new'))
+    assert view.rename_candidate(
+        tmp_path.joinpath('dir'), tmp_path.joinpath('new'), 0)
+    assert _paths(view, tmp_path) == ['new', 'new/x', 'b']
+
+    tmp_path.joinpath('b').rename(tmp_path.joinpath('.b'))
+    assert view.rename_candidate(
+        tmp_path.joinpath('b'), tmp_path.joinpath('.b'), 0)
+    assert _paths(view, tmp_path) == ['new', 'new/x']
+
+
+def test_refresh_directory(tmp_path, fake_nvim):
+    tmp_path.joinpath('dir/sub').mkdir(parents=True)
+    tmp_path.joinpath('dir/sub/x').touch()
+    tmp_path.joinpath('b').touch()
+    view = _init_view(tmp_path, fake_nvim)
+    view.open_tree(tmp_path.joinpath('dir'), 0, False)
+    view.open_tree(tmp_path.joinpath('dir/sub'), 0, False)
+
+    defx = view._defxs[0]
+    listed = []
+    list_candidates = defx._list_candidates
+    defx._list_candidates = lambda x: listed.append(x) or list_candidates(x)
+
+    # Only the changed directory is listed
+    tmp_path.joinpath('a').touch()
+    view.refresh_directory(tmp_path, 0)
+    assert listed == [str(tmp_path)]
+    assert _paths(view, tmp_path) == ['dir', 'dir/sub', 'dir/sub/x',
+                                      'a', 'b']
+
+    # The changed children are refreshed after the parents
+    listed.clear()
+    tmp_path.joinpath('c').touch()
+    tmp_path.joinpath('dir/sub/y').touch()
+    view._refresh_directories([str(tmp_path.joinpath('dir/sub')),
+                               str(tmp_path)])
+    assert listed == [str(tmp_path), str(tmp_path.joinpath('dir/sub'))]
+    assert _paths(view, tmp_path) == ['dir', 'dir/sub', 'dir/sub/x',
+                                      'dir/sub/y', 'a', 'b', 'c']
+
+
+def test_update_tree_views(tmp_path, fake_nvim):
+    tmp_path.joinpath('a').touch()
+    view = _init_view(tmp_path, fake_nvim)
+    other = _init_view(tmp_path, fake_nvim)
+    view._views = other._views = [view, other]
+    tmp_path.joinpath('b').touch()
+    Kind(fake_nvim).update_tree(view, [(None, tmp_path.joinpath('b'))])
+    assert _paths(view, tmp_path) == ['a', 'b']
+    assert _paths(other, tmp_path) == ['a', 'b']
+
+
+def test_remove_paths_views(tmp_path, fake_nvim):
+    tmp_path.joinpath('a').touch()
+    tmp_path.joinpath('b').touch()
+    view = _init_view(tmp_path, fake_nvim)
+    other = _init_view(tmp_path, fake_nvim)
+    view._views = other._views = [view, other]
+
+    Kind(fake_nvim).remove_paths(view, view._defxs[0],
+                                 [tmp_path.joinpath('a')])
+    assert _paths(view, tmp_path) == ['b']
+    assert _paths(other, tmp_path) == ['b']
+
+
+def test_narrow_keeps_tree(tmp_path, fake_nvim):
+    tmp_path.joinpath('dir').mkdir()
+    tmp_path.joinpath('dir/x').touch()
+    tmp_path.joinpath('bar').touch()
+    tmp_path.joinpath('baz').touch()
+    view = _init_view(tmp_path, fake_nvim)
+    view.open_tree(tmp_path.joinpath('dir'), 0, False)
+    view.update_candidates()
+    new_context = {'cursor': 1, 'visual_start': 0, 'visual_end': 0}
+
+    # The roots are shown without the matches
+    view.do_action('narrow', ['nothing'], new_context)
+    assert _paths(view, tmp_path) == []
+    assert view._candidates[0]['is_root']
+
+    view.do_action('narrow', ['ba'], new_context)
+    assert _paths(view, tmp_path) == ['bar', 'baz']
+
+    # The cursor is converted to the whole candidates
+    new_context['cursor'] = 3
+    view.do_action('toggle_select', [], new_context)
+    assert _paths(view, tmp_path) == ['dir', 'dir/x', 'bar', 'baz']
+    assert [x['word'] for x in view._candidates if x['is_selected']] == [
+        'baz']
+    assert str(tmp_path.joinpath('dir')) in view._defxs[0]._opened_candidates
+
+
+def test_narrow_other_views(tmp_path, fake_nvim):
+    tmp_path.joinpath('bar').touch()
+    tmp_path.joinpath('foo').touch()
+    rplugin = Rplugin(fake_nvim)
+    view = _init_view(tmp_path, fake_nvim)
+    other = _init_view(tmp_path, fake_nvim)
+    view._bufnr = fake_nvim.current.buffer.number
+    rplugin._views += [view, other]
+
+    redrawn = []
+    other.redraw = lambda is_force=False: redrawn.append(is_force)
+    new_context = {'cursor': 1, 'visual_start': 0, 'visual_end': 0}
+    rplugin._do_action(view, ['narrow', ['b'], new_context])
+    rplugin._do_action(view, ['narrow', ['ba'], new_context])
+    rplugin._do_action(view, ['narrow', [''], new_context])
+    assert redrawn == []
+
+
+def test_batch_redraw(tmp_path, fake_nvim):
+    tmp_path.joinpath('a').touch()
+    tmp_path.joinpath('b').touch()
+    view = _init_view(tmp_path, fake_nvim)
+
+    gathered = []
+    init_candidates = view._init_candidates
+    view._init_candidates = lambda: gathered.append(1) or init_candidates()
+    written = []
+    redraw = view._redraw
+    view._redraw = lambda x: written.append(x) or redraw(x)
+    cursors = []
+    fake_nvim.functions['cursor'] = cursors.append
+
+    with view.batch_redraw():
+        view.redraw(True)
+        view.redraw(True)
+        assert view.search_file(tmp_path.joinpath('b'), 0)
+        assert gathered == [1]
+        assert written == [] and cursors == []
+        view.redraw(True)
+    assert gathered == [1, 1]
+    assert written == [True]
+    assert cursors[-1] == [3, 1]